@@ -0,0 +1,124 @@
+import asyncio
+import os
+import socket
+import uuid
+from typing import List, Optional
+
+from application.scraper_service import ScraperService
+from config import settings
+from infrastructure.db.models.job import ScrapeJob
+from infrastructure.progress_store import ProgressStore
+from infrastructure.repository import JobRepository, UserProgressRepository
+
+# phase -> (progress key the phase marks on success, next phase)
+PHASES = {
+    "details": ("detailed_users", "posts"),
+    "posts": ("posts_scraped_users", "full_content"),
+    "full_content": ("full_content_scraped_users", "followers"),
+    "followers": ("followers_scraped_users", None),
+}
+
+
+class JobWorker:
+    """
+    Claims (username, phase) jobs from the shared scrape_jobs table, runs them with
+    ScraperService and keeps their leases alive while they run. Jobs whose worker
+    dies are re-leased by any other worker once the lease expires.
+
+    Each job runs against the user's ProgressStore state from the user_progress table,
+    checkpointed on every flush, so a failed or re-leased job resumes from its page
+    cursors instead of page 1.
+    """
+
+    def __init__(self, scraper: ScraperService, job_repo: JobRepository,
+                 progress_repo: Optional[UserProgressRepository] = None):
+        self.scraper = scraper
+        self.jobs = job_repo
+        self.progress = progress_repo or UserProgressRepository(job_repo.session)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = settings.JOB_LEASE_SECONDS
+        self.batch_size = settings.JOB_BATCH_SIZE
+        self.max_attempts = settings.JOB_MAX_ATTEMPTS
+        self.poll_interval = settings.JOB_POLL_INTERVAL
+        self._active: List[int] = []
+        self.completed = 0
+        self.failed = 0
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            self.jobs.heartbeat(list(self._active), self.worker_id, self.lease_seconds)
+
+    def _user_progress(self, username: str) -> ProgressStore:
+        progress = ProgressStore(None, on_flush=lambda snapshot: self.progress.save(username, snapshot))
+        state = self.progress.load(username)
+        if state:
+            progress.restore(state)
+        return progress
+
+    async def _run_job(self, job: ScrapeJob):
+        progress_key, next_phase = PHASES[job.phase]
+        # Completion is tracked in the job table; the user's stored progress tells us
+        # whether the phase reached its success path and where to resume it
+        progress = self._user_progress(job.username)
+        phase = {
+            "details": self.scraper.scrape_user_details,
+            "posts": self.scraper.scrape_user_posts,
+            "full_content": self.scraper.scrape_full_post_contents,
+            "followers": self.scraper.scrape_user_followers,
+        }[job.phase]
+
+        try:
+            await phase(job.username, progress)
+            succeeded = progress.contains(progress_key, job.username)
+            error = None if succeeded else "phase did not complete"
+            if succeeded and job.phase == "full_content" and progress.count("failed_full_content_posts"):
+                await self.scraper.retry_failed_full_contents(progress)
+                failed_posts = progress.count("failed_full_content_posts")
+                # Retry the job while attempts remain; after that let the chain move on
+                if failed_posts and job.attempts < self.max_attempts:
+                    succeeded, error = False, f"{failed_posts} posts without full content"
+            progress.flush()
+        except Exception as e:
+            self.scraper.session.rollback()
+            succeeded, error = False, str(e)
+
+        if succeeded:
+            self.jobs.complete(job, next_phase)
+            self.completed += 1
+        else:
+            self.jobs.fail(job, error, self.max_attempts)
+            self.failed += 1
+
+    async def run(self, wait: bool = False):
+        print(f"Worker {self.worker_id} started")
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            while True:
+                claimed = self.jobs.claim(self.worker_id, self.batch_size, self.lease_seconds)
+                if not claimed:
+                    if not wait and not self.jobs.has_open_jobs():
+                        break
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+                self._active = [job.id for job in claimed]
+                slots = asyncio.Semaphore(max(1, self.scraper.concurrency))
+
+                async def run_bounded(job: ScrapeJob):
+                    async with slots:
+                        await self._run_job(job)
+
+                await asyncio.gather(*(run_bounded(job) for job in claimed))
+                self._active = []
+                # Session per batch: drop the finished jobs and everything the phases loaded
+                self.scraper.session.commit()
+                self.scraper.session.expunge_all()
+                print(f"Worker {self.worker_id}: {self.completed} jobs done, {self.failed} failed")
+        finally:
+            heartbeat.cancel()
+            await self.scraper.aclose()
+
+        self.scraper.print_change_stats()
+        print(f"Worker {self.worker_id} finished — job table: {self.jobs.counts()}")
+
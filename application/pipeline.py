@@ -0,0 +1,174 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, AsyncIterable, AsyncIterator, Iterable, Union
+
+# Returns False when the item failed the stage; it is then not forwarded
+Handler = Callable[[str], Awaitable[Optional[bool]]]
+
+_DONE = object()
+
+
+async def merge_streams(*sources: AsyncIterable) -> AsyncIterator:
+    """
+    Yields items from several async iterables as they arrive. Every item is a handoff:
+    its source stays suspended at that item until the consumer has taken it and asked
+    for the next one, so a source never advances (e.g. checkpoints a cursor) past
+    items nobody consumed. Closing the merged stream cancels and closes every source.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump(source: AsyncIterable):
+        try:
+            async for item in source:
+                taken = asyncio.get_running_loop().create_future()
+                await queue.put((item, None, taken))
+                await taken
+            await queue.put((_DONE, None, None))
+        except Exception as e:
+            await queue.put((_DONE, e, None))
+
+    tasks = [asyncio.create_task(pump(source)) for source in sources]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            item, error, taken = await queue.get()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                remaining -= 1
+                continue
+            yield item
+            taken.set_result(None)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for source in sources:
+            if hasattr(source, "aclose"):
+                await source.aclose()
+
+
+class Stage:
+    def __init__(self, name: str, handler: Handler, workers: int = 1, queue_size: int = 100):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        self.processed = 0
+        self.failed = 0
+        self.busy = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+
+    def stats(self, elapsed: float) -> Dict[str, Union[str, int, float]]:
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "busy": self.busy,
+            "processed": self.processed,
+            "failed": self.failed,
+            "per_second": round(self.processed / elapsed, 2) if elapsed else 0.0,
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "utilization": round(self.busy_seconds / (elapsed * self.workers), 2) if elapsed else 0.0,
+        }
+
+
+class StagedPipeline:
+    """
+    Chains stages with bounded queues. Each stage runs its own worker count and
+    forwards usernames to the next stage once its handler succeeds, so a slow stage
+    fills its input queue and blocks upstream producers (backpressure) instead
+    of letting work pile up in memory. A username whose handler raises or returns
+    False is counted as failed and goes no further.
+    """
+
+    def __init__(self, stages: List[Stage], report_every: float = 30.0):
+        self.stages = stages
+        self.report_every = report_every
+        self.started_at = time.monotonic()
+
+    async def run(self, source: Union[Iterable[str], AsyncIterable[str]]) -> None:
+        self.started_at = time.monotonic()
+        tasks = [asyncio.create_task(self._feed(source))]
+        for index, stage in enumerate(self.stages):
+            next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            tasks.append(asyncio.create_task(self._run_stage(stage, next_stage)))
+
+        reporter = asyncio.create_task(self._report_periodically())
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            reporter.cancel()
+            for task in tasks:
+                task.cancel()
+        self.print_stats()
+
+    async def _feed(self, source: Union[Iterable[str], AsyncIterable[str]]) -> None:
+        first = self.stages[0]
+        if hasattr(source, "__aiter__"):
+            async for username in source:
+                await self._put(first, username)
+        else:
+            for username in source:
+                await self._put(first, username)
+
+        for _ in range(first.workers):
+            await first.queue.put(_DONE)
+
+    @staticmethod
+    async def _put(stage: Stage, item) -> None:
+        await stage.queue.put(item)
+        stage.max_queue_depth = max(stage.max_queue_depth, stage.queue.qsize())
+
+    async def _run_stage(self, stage: Stage, next_stage: Optional[Stage]) -> None:
+        await asyncio.gather(*(self._worker(stage, next_stage) for _ in range(stage.workers)))
+        if next_stage:
+            for _ in range(next_stage.workers):
+                await next_stage.queue.put(_DONE)
+
+    async def _worker(self, stage: Stage, next_stage: Optional[Stage]) -> None:
+        while True:
+            username = await stage.queue.get()
+            if username is _DONE:
+                return
+
+            stage.busy += 1
+            started_at = time.monotonic()
+            succeeded = False
+            try:
+                succeeded = await stage.handler(username) is not False
+                if not succeeded:
+                    print(f"[{stage.name}] @{username} failed - not passed on")
+            except Exception as e:
+                print(f"[{stage.name}] @{username} failed: {e}")
+            finally:
+                stage.busy -= 1
+                stage.busy_seconds += time.monotonic() - started_at
+            if succeeded:
+                stage.processed += 1
+            else:
+                stage.failed += 1
+                continue
+
+            if next_stage:
+                await self._put(next_stage, username)
+
+    async def _report_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.report_every)
+            self.print_stats()
+
+    def stats(self) -> List[Dict[str, Union[str, int, float]]]:
+        elapsed = time.monotonic() - self.started_at
+        return [stage.stats(elapsed) for stage in self.stages]
+
+    def print_stats(self) -> None:
+        print("\nPipeline stats:")
+        for row in self.stats():
+            print(
+                f"  {row['stage']:<14} {row['processed']:>7} done, {row['failed']:>4} failed, "
+                f"{row['per_second']:>7}/s, queue {row['queue_depth']:>4} (max {row['max_queue_depth']}), "
+                f"busy {row['busy']}/{row['workers']}, utilization {row['utilization']:.0%}"
+            )
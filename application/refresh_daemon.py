@@ -0,0 +1,212 @@
+import asyncio
+import heapq
+import math
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from application.scraper_service import ScraperService
+from config import settings
+from infrastructure.api.rate_limiter import RequestBudget
+from infrastructure.progress_store import DEFAULT_SETS, ProgressStore
+from infrastructure.repository import RefreshRepository, JobRepository, UserProgressRepository
+
+# phase -> progress key the phase marks on success (same keys as the one-shot scrape)
+PHASES = {
+    "details": "detailed_users",
+    "posts": "posts_scraped_users",
+    "followers": "followers_scraped_users",
+}
+
+
+class RefreshDaemon:
+    """
+    Keeps already scraped users current. Every (user, phase) pair is tracked in
+    user_refresh with its last fetch time; each round loads the oldest candidates
+    that have not been attempted for REFRESH_MIN_AGE_HOURS and refreshes the
+    REFRESH_BATCH_SIZE most valuable ones first, by
+
+        priority = hours since last fetch * activity
+
+    where activity grows with the user's follower count (details, followers) or
+    their recent posts (posts). Requests are paid from an hourly budget charged with
+    what each refresh actually sent, so the daemon never exceeds it on average.
+
+    With REFRESH_SKIP_UNCHANGED_FOLLOWERS, a details refresh that finds the profile
+    unchanged (same fingerprint, so the same follower count) also counts as a
+    followers refresh, which is skipped. An equal count does not mean the same
+    followers, so this trades accuracy for requests and is off by default.
+
+    Refreshes run against the user's progress in user_progress, shared with the job
+    workers, so a posts refresh continues an unfinished backfill and retries posts
+    whose full content failed. Users without a row start from what the progress
+    file recorded for them.
+    """
+
+    def __init__(self, scraper: ScraperService, refresh_repo: RefreshRepository, job_repo: Optional[JobRepository] = None,
+                 progress_repo: Optional[UserProgressRepository] = None):
+        self.scraper = scraper
+        # A refresh is only worth its budget if it sees the live data: cached responses
+        # (up to 24h old for user profiles) would stamp stale data as fresh
+        self.scraper.api.read_cache = False
+        self.refresh = refresh_repo
+        self.jobs = job_repo
+        self.progress = progress_repo or UserProgressRepository(refresh_repo.session)
+        self._file_progress = ProgressStore(None)
+        self.phases = [phase for phase in settings.REFRESH_PHASES if phase in PHASES]
+        self.min_age = timedelta(hours=settings.REFRESH_MIN_AGE_HOURS)
+        self.activity_window = timedelta(days=settings.REFRESH_ACTIVITY_DAYS)
+        self.batch_size = max(1, settings.REFRESH_BATCH_SIZE)
+        self.poll_interval = settings.REFRESH_POLL_INTERVAL
+        self.skip_unchanged_followers = settings.REFRESH_SKIP_UNCHANGED_FOLLOWERS
+        self.budget = RequestBudget(settings.REFRESH_REQUESTS_PER_HOUR)
+        self.refreshed = 0
+        self.failed = 0
+        self.requests = 0
+        self.skipped = 0
+        self._followers_current = set()
+
+    def _progress_entries(self) -> List[Tuple[str, str, Optional[datetime]]]:
+        path = self.scraper.progress_file
+        stamps = [os.path.getmtime(p) for p in (path, f"{path}.journal") if os.path.exists(p)]
+        if not stamps:
+            return []
+        # Phases finished at some point before the progress file was last written
+        fetched_at = datetime.fromtimestamp(max(stamps), timezone.utc)
+        # Read-only: the scraper may still be writing these files
+        progress = self._file_progress = ProgressStore.read(path)
+        return [
+            (username, phase, fetched_at)
+            for phase in self.phases
+            for username in progress.members(PHASES[phase])
+        ]
+
+    def seed(self) -> int:
+        entries = self._progress_entries()
+        if self.jobs:
+            entries.extend(self.jobs.finished(self.phases))
+        return self.refresh.seed(entries)
+
+    @staticmethod
+    def priority(row, now: datetime) -> float:
+        if row.phase == "posts":
+            activity = 1 + row.recent_posts
+        else:
+            activity = 1 + math.log1p(row.followers_count)
+        if row.fetched_at is None:
+            return math.inf
+        fetched_at = row.fetched_at if row.fetched_at.tzinfo else row.fetched_at.replace(tzinfo=timezone.utc)
+        return (now - fetched_at).total_seconds() / 3600 * activity
+
+    def _next_batch(self, attempted_before: Optional[datetime] = None) -> List:
+        now = datetime.now(timezone.utc)
+        attempted_before = min(now - self.min_age, attempted_before or now)
+        # A window of the oldest candidates, so a very active user fetched a little
+        # more recently can still overtake a dormant one
+        rows = self.refresh.stale(self.phases, attempted_before, now - self.activity_window, self.batch_size * 10)
+        queue = [
+            (-self.priority(row, now), -row.followers_count, row.username, row.phase, index)
+            for index, row in enumerate(rows)
+        ]
+        heapq.heapify(queue)
+        return [rows[heapq.heappop(queue)[-1]] for _ in range(min(self.batch_size, len(queue)))]
+
+    def _user_progress(self, username: str) -> ProgressStore:
+        progress = ProgressStore(None, on_flush=lambda snapshot: self.progress.save(username, snapshot))
+        state = self.progress.load(username)
+        if state:
+            progress.restore(state)
+            return progress
+
+        for key in DEFAULT_SETS:
+            if self._file_progress.contains(key, username):
+                progress.add(key, username)
+        for phase in ("posts", "posts_backfill", "followers"):
+            cursor = self._file_progress.get_cursor(phase, username)
+            if cursor:
+                progress.set_cursor(phase, username, cursor)
+        return progress
+
+    async def _retry_failed_posts(self, username: str, progress: ProgressStore):
+        await self.scraper.retry_failed_full_contents(progress)
+
+    async def _refresh(self, row) -> None:
+        if row.phase == "followers" and row.username in self._followers_current:
+            return
+        await self.budget.reserve(row.requests or 1)
+        sent_before = self.scraper.api.requests_sent
+
+        # Drop the phase's done markers so it runs again
+        progress = self._user_progress(row.username)
+        progress.discard(PHASES[row.phase], row.username)
+        if row.phase == "posts":
+            progress.discard("full_content_scraped_users", row.username)
+            # Without an unfinished backfill the stored history counts as complete, so
+            # posts stop at the first page holding an already stored post
+            if not progress.get_cursor("posts_backfill", row.username):
+                progress.add("posts_complete_users", row.username)
+        steps = {
+            "details": [self.scraper.scrape_user_details],
+            "posts": [self.scraper.scrape_user_posts, self.scraper.scrape_full_post_contents, self._retry_failed_posts],
+            "followers": [self.scraper.scrape_user_followers],
+        }[row.phase]
+
+        unchanged = False
+        try:
+            for step in steps:
+                unchanged = await step(row.username, progress) is False
+            succeeded = progress.contains(PHASES[row.phase], row.username)
+            progress.flush()
+        except Exception as e:
+            self.scraper.session.rollback()
+            print(f"Error refreshing {row.phase} of @{row.username}: {e}")
+            succeeded = False
+
+        sent = self.scraper.api.requests_sent - sent_before
+        self.budget.spend(sent)
+        self.requests += sent
+        self.refresh.mark(row.username, row.phase, succeeded, sent)
+        if succeeded:
+            self.refreshed += 1
+        else:
+            self.failed += 1
+
+        if (self.skip_unchanged_followers and succeeded and unchanged
+                and row.phase == "details" and "followers" in self.phases):
+            self.refresh.mark(row.username, "followers", True, None)
+            self._followers_current.add(row.username)
+            self.skipped += 1
+
+    async def run(self, wait: bool = False):
+        print(f"Refresh daemon started — phases: {', '.join(self.phases)}, "
+              f"budget: {settings.REFRESH_REQUESTS_PER_HOUR:g} requests/hour")
+        print(f"Started tracking {self.seed()} user/phase entries")
+        # Without wait a run is a single pass: nothing is attempted twice in it
+        started_at = None if wait else datetime.now(timezone.utc)
+        try:
+            while True:
+                batch = self._next_batch(started_at)
+                if not batch:
+                    if not wait:
+                        break
+                    # Pick up users scraped or finished by workers since the last seed
+                    added = self.seed()
+                    if added:
+                        print(f"Started tracking {added} more user/phase entries")
+                        continue
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+                # Refreshes run one at a time so each one's request count is exact
+                for row in batch:
+                    await self._refresh(row)
+                self._followers_current.clear()
+                self.scraper.session.commit()
+                self.scraper.session.expunge_all()
+                print(f"Refresh: {self.refreshed} done, {self.failed} failed, {self.skipped} skipped as unchanged, "
+                      f"{self.requests} requests sent")
+        finally:
+            await self.scraper.aclose()
+            self.scraper.print_change_stats()
+
+        print(f"Nothing left to refresh — tracked: {self.refresh.counts()}")
@@ -1,293 +1,961 @@
 import asyncio
 import json
-import os
-from typing import List, Dict
+import time
+from contextlib import aclosing
+from itertools import zip_longest
+from typing import List, Dict, Optional, AsyncIterator, AsyncIterable, Callable
 
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.orm import Session
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from application.pipeline import Stage, StagedPipeline, merge_streams
+from application.target_selector import TargetSelector
 from config import settings
 from core.entities import UserData, PostData
-from infrastructure.api.medium_api import MediumApi
-from infrastructure.db.models.post import Post
+from infrastructure.api.medium_api import MediumApi, graphql_data
+from infrastructure.api.rate_limiter import AdaptiveRateLimiter
+from infrastructure.api.response_cache import ResponseCache
+from infrastructure.api.transport import ReplayTransport, RecordingTransport
+from infrastructure.async_repository import (
+    AsyncUserRepository,
+    AsyncPostRepository,
+    AsyncFollowRepository,
+    AsyncTopicRepository,
+    create_async_session_factory
+)
 from infrastructure.db.models.user import User
-from infrastructure.repository import UserRepository, PostRepository
+from infrastructure.progress_store import ProgressStore
+from infrastructure.repository import UserRepository, PostRepository, FollowRepository, TopicRepository, JobRepository
+from infrastructure.utils.id_set import CompactIdSet
 from infrastructure.utils.parsers import parse_user_about_to_text
 from infrastructure.utils.post_mapper import extract_post_data
+from infrastructure.utils.topic_mapper import extract_topic_rows
 from infrastructure.utils.user_mapper import extract_user_data
+from infrastructure.write_behind import WriteBehindWriter
 
 
 class ScraperService:
-    def __init__(self, db_session: Session):
+    def __init__(
+            self,
+            db_session: Session,
+            cache_dir: Optional[str] = None,
+            api_base_url: Optional[str] = None,
+            record_path: Optional[str] = None,
+            replay_path: Optional[str] = None,
+            session_factory: Optional[Callable[[], Session]] = None,
+            async_engine: Optional[AsyncEngine] = None
+    ):
         self.session = db_session
-        self.api = MediumApi()
+        cache_dir = cache_dir or settings.RESPONSE_CACHE_DIR
+        self.api = MediumApi(
+            proxy_list=settings.PROXY_LIST,
+            timeout=settings.REQUEST_TIMEOUT,
+            batch_size=settings.GRAPHQL_BATCH_SIZE,
+            batch_window=settings.GRAPHQL_BATCH_WINDOW_MS / 1000,
+            rate_limiter=AdaptiveRateLimiter(
+                initial_rate=settings.RATE_LIMIT_INITIAL_RPS,
+                min_rate=settings.RATE_LIMIT_MIN_RPS,
+                max_rate=settings.RATE_LIMIT_MAX_RPS,
+                increase=settings.RATE_LIMIT_INCREASE_RPS,
+                backoff=settings.RATE_LIMIT_BACKOFF
+            ),
+            cache=ResponseCache(
+                cache_dir,
+                max_bytes=settings.RESPONSE_CACHE_MAX_MB * 1024 * 1024
+            ) if cache_dir else None,
+            transport=ReplayTransport(replay_path) if replay_path else None,
+            base_url=api_base_url or settings.MEDIUM_BASE_URL
+        )
+        if record_path and not replay_path:
+            self.api.transport = RecordingTransport(self.api.transport, record_path)
         self.user_repo = UserRepository(db_session)
         self.post_repo = PostRepository(db_session)
+        self.follow_repo = FollowRepository(db_session)
+        self.topic_repo = TopicRepository(db_session)
+        self.topics_file = settings.TOPICS_FILE
+        self.expand_topic_subtrees = False
+        self.refresh_topics = False
+        self.topic_recrawl = False
         self.progress_file = settings.PROGRESS_FILE
         self.target_users = settings.SCRAPE_TARGET_USERS
+        self.concurrency = settings.SCRAPE_CONCURRENCY
+        self.followers_per_user = settings.FOLLOWERS_PER_USER
+        self.posts_max_pages = settings.POSTS_MAX_PAGES
+        self.discovery_sources = list(settings.DISCOVERY_SOURCES)
+        self.feed_max_pages = settings.FEED_MAX_PAGES
+        self.selection_mode = settings.SELECTION_MODE
+        self.selection_weights = dict(settings.SELECTION_WEIGHTS)
+        self.session_recycle_every = max(1, settings.SESSION_RECYCLE_EVERY)
+        self._users_since_recycle = 0
+        # Rows written vs. left alone because their fingerprint matched, for this run
+        self.change_stats = {kind: {"changed": 0, "unchanged": 0} for kind in ("users", "posts")}
+        self.full_content_slots = asyncio.Semaphore(settings.FULL_CONTENT_CONCURRENCY)
+        self.stage_workers = dict(settings.PIPELINE_STAGE_WORKERS) if settings.PIPELINE_ENABLED else None
+        self.writer = WriteBehindWriter(
+            session_factory,
+            max_batch=settings.WRITE_BEHIND_BATCH_SIZE,
+            max_delay=settings.WRITE_BEHIND_MAX_DELAY_MS / 1000
+        ) if session_factory else None
+        self.async_engine = async_engine
+        if async_engine:
+            async_session_factory = create_async_session_factory(async_engine)
+            self.async_user_repo = AsyncUserRepository(async_session_factory)
+            self.async_post_repo = AsyncPostRepository(async_session_factory)
+            self.async_follow_repo = AsyncFollowRepository(async_session_factory)
+            self.async_topic_repo = AsyncTopicRepository(async_session_factory)
+        else:
+            self.async_user_repo = self.async_post_repo = self.async_follow_repo = self.async_topic_repo = None
+
+    def _load_progress(self) -> ProgressStore:
+        return ProgressStore(
+            self.progress_file,
+            fsync_every=settings.PROGRESS_FSYNC_EVERY,
+            fsync_interval=settings.PROGRESS_FSYNC_INTERVAL
+        )
+
+    def _save_progress(self, progress: ProgressStore):
+        progress.flush()
+
+    # With the write-behind writer enabled these return once the rows are committed by
+    # the writer thread, so progress is only marked after the data is durable. With the
+    # async DB layer they await the async repositories; otherwise they block on the session.
+    async def _get_user(self, username: str) -> Optional[User]:
+        if self.async_user_repo:
+            return await self.async_user_repo.get_by_username(username)
+        user = self.user_repo.get_by_username(username)
+        if user and self.writer:
+            # Details were committed from the writer's session; drop any stale copy
+            self.session.refresh(user)
+        return user
+
+    async def _post_ids_without_content(self, author_id: str) -> List[str]:
+        if self.async_post_repo:
+            return await self.async_post_repo.get_ids_without_content(author_id)
+        return self.post_repo.get_ids_without_content(author_id)
+
+    async def _store_user_stub(self, user_id: str, username: str):
+        if self.async_user_repo:
+            # Never block the loop on a row an async transaction may be holding
+            await self.async_user_repo.insert_missing_users([{"id": user_id, "username": username}])
+            return
+        existing = self.session.query(User).filter(User.username == username).first()
+        if not existing:
+            self.session.add(User(id=user_id, username=username))
+        self.session.commit()
 
-
-    def _load_progress(self) -> Dict:
-        if os.path.exists(self.progress_file):
-            with open(self.progress_file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return {
-            "collected_users": [],
-            "completed_topics": [],
-            "detailed_users": [],
-            "posts_scraped_users": [],
-            "followers_scraped_users": [],
-            "full_content_scraped_users": []
-        }
-
-    def _save_progress(self, progress: Dict):
-        with open(self.progress_file, "w", encoding="utf-8") as f:
-            json.dump(progress, f, indent=2, ensure_ascii=False)
+    async def _existing_post_ids(self, post_ids: List[str]) -> set:
+        if not post_ids:
+            return set()
+        if self.async_post_repo:
+            return await self.async_post_repo.get_existing_ids(post_ids)
+        return self.post_repo.get_existing_ids(post_ids)
+
+    async def _store_topic_members(self, topic: str, users: List[tuple], start_rank: int) -> int:
+        members = [(user_id, username) for username, user_id, _ in users if user_id]
+        if self.async_topic_repo:
+            return await self.async_topic_repo.store_members(topic, members, start_rank)
+        return self.topic_repo.store_members(topic, members, start_rank)
+
+    def _count_changes(self, kind: str, total: int, changed: List[str]) -> List[str]:
+        changed = list(dict.fromkeys(changed))
+        self.change_stats[kind]["changed"] += len(changed)
+        self.change_stats[kind]["unchanged"] += total - len(changed)
+        return changed
+
+    async def _store_users(self, users: List[UserData], about_texts: Dict[str, str]) -> List[str]:
+        """Upserts the users and returns the ids that were new or changed."""
+        if self.writer:
+            changed = await self.writer.put_users(users, about_texts)
+        elif self.async_user_repo:
+            changed = await self.async_user_repo.bulk_upsert_users(users, about_texts=about_texts)
+        else:
+            changed = self.user_repo.bulk_upsert_users(users, about_texts=about_texts)
+        return self._count_changes("users", len({user.user_id for user in users}), changed)
+
+    async def _store_posts(self, posts: List[PostData]) -> List[str]:
+        """Upserts the posts and returns the ids that were new or changed."""
+        if self.writer:
+            changed = await self.writer.put_posts(posts)
+        elif self.async_post_repo:
+            changed = await self.async_post_repo.bulk_upsert_posts(posts)
+        else:
+            changed = self.post_repo.bulk_upsert_posts(posts)
+        return self._count_changes("posts", len({post.post_id for post in posts}), changed)
+
+    async def _store_post_content(self, post_id: str, content: str):
+        if self.writer:
+            await self.writer.put_post_content(post_id, content)
+        elif self.async_post_repo:
+            await self.async_post_repo.set_content(post_id, content)
+        else:
+            self.post_repo.set_content(post_id, content)
+
+    async def _store_followers(self, followed_id: str, followers: List[Dict]):
+        stub_users = [
+            {"id": f["id"], "username": f["username"], "name": f.get("name"), "bio": f.get("bio")}
+            for f in followers
+        ]
+        edges = [(f["id"], followed_id) for f in followers]
+        if self.writer:
+            await self.writer.put_followers(stub_users, edges)
+        elif self.async_follow_repo:
+            await self.async_follow_repo.bulk_insert_followers(stub_users, edges)
+        else:
+            self.follow_repo.bulk_insert_followers(stub_users, edges)
+
+    def load_topic_taxonomy(self, data=None) -> int:
+        if data is None:
+            with open(self.topics_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        rows = extract_topic_rows(data)
+        self.topic_repo.bulk_upsert_topics(rows)
+        print(f"Loaded {len(rows)} topics into the taxonomy")
+        return len(rows)
+
+    async def refresh_topic_taxonomy(self) -> int:
+        response = await self.api.get_topics_data()
+        if not extract_topic_rows(response):
+            print("ExploreTopicsQuery returned no topics - keeping the current taxonomy")
+            return 0
+        with open(self.topics_file, "w", encoding="utf-8") as f:
+            json.dump(response, f, ensure_ascii=False, indent=4)
+        return self.load_topic_taxonomy(response)
+
+    async def resolve_topics(self, topics: List[str]) -> List[str]:
+        """Optionally refreshes the taxonomy, then expands each topic slug to its whole subtree."""
+        if self.refresh_topics:
+            await self.refresh_topic_taxonomy()
+        if not self.expand_topic_subtrees:
+            return topics
+
+        if not self.topic_repo.count():
+            self.load_topic_taxonomy()
+        expanded = self.topic_repo.expand_slugs(topics)
+        if len(expanded) != len(topics):
+            print(f"Expanded {len(topics)} topics to {len(expanded)} including subtopics")
+        return expanded
 
     @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=2, max=30), reraise=True)
     async def _fetch_topic_authors_page(self, topic: str, after: str = "") -> Dict:
         return await self.api.get_topic_authors(topic, after_user_id=after)
 
-    async def collect_users_from_topics(self, topics: List[str], progress: Dict):
-        print(f"\nCollecting ALL users from {len(topics)} topics (no early stop)")
-
-        all_unique_usernames = set()
-
-        username_to_id = {}
-
+    async def _fetch_topic_round(self, topics: Dict[str, Dict]) -> Dict[str, Dict]:
+        names = list(topics)
+        results = await asyncio.gather(
+            *(self._fetch_topic_authors_page(topic, topics[topic]["after"]) for topic in names),
+            return_exceptions=True
+        )
+        return dict(zip(names, results))
+
+    async def discover_topic_users(
+            self,
+            topics: List[str],
+            progress: ProgressStore,
+            recrawl: bool = False
+    ) -> AsyncIterator[tuple]:
+        """
+        Pages every pending topic concurrently, one page per topic per round, and
+        yields (topic, username, user_id, signals) interleaved round-robin across topics
+        so no single large topic dominates the front of the stream. signals carries the
+        user's rank in the topic and the quality hints of the recommendation payload.
+
+        Every page is recorded in topic_users with each user's rank in the topic. With
+        recrawl, completed topics are walked again from the top and each stops at the
+        first page that brings no new members.
+        """
+        active = {}
         for topic in topics:
-            if topic in progress["completed_topics"]:
+            if recrawl:
+                progress.discard("completed_topics", topic)
+                progress.clear_cursor("topics", topic)
+            if progress.contains("completed_topics", topic):
                 print(f"Topic '{topic}' already processed - skipping")
+            else:
+                saved = progress.get_cursor("topics", topic) or ""
+                # Older progress files store the bare endCursor
+                after, rank = (saved, 0) if isinstance(saved, str) else (saved["after"], saved["rank"])
+                if after:
+                    print(f"Resuming topic '{topic}' from saved cursor")
+                active[topic] = {"after": after, "retry_at": 0.0, "users": rank}
+
+        while active:
+            now = time.monotonic()
+            ready = {topic: state for topic, state in active.items() if state["retry_at"] <= now}
+            if not ready:
+                await asyncio.sleep(min(state["retry_at"] for state in active.values()) - now)
                 continue
 
-            print(f"\nFetching ALL users from topic: {topic}")
-            after = ""
-            topic_total = 0
-
-            while True:
+            pages = []
+            next_cursors = {}
+            for topic, resp in (await self._fetch_topic_round(ready)).items():
+                state = active[topic]
                 try:
-                    resp = await self._fetch_topic_authors_page(topic, after)
-                    edges = resp[0]["data"]["recommendedPublishers"]["edges"]
-
-                    if not edges:
-                        print(f"No more users in topic {topic}")
-                        break
-
-                    for edge in edges:
-                        node = edge["node"]
-                        if node["__typename"] != "User":
-                            continue
-
-                        username = node["username"]
-                        user_id = node.get("id")
+                    if isinstance(resp, Exception):
+                        raise resp
+                    publishers = graphql_data(resp, "WhoToFollowFeedQuery")["recommendedPublishers"]
+                    users = [
+                        (node["username"], node.get("id"), self._publisher_signals(node, state["users"] + index))
+                        for index, node in enumerate(
+                            edge["node"] for edge in publishers["edges"] if edge["node"]["__typename"] == "User"
+                        )
+                    ]
+                    page_info = publishers["pageInfo"]
+                except Exception as e:
+                    print(f"Error in topic {topic}: {e} - retrying it in 30 seconds...")
+                    state["retry_at"] = time.monotonic() + 30
+                    continue
 
-                        if username not in all_unique_usernames:
-                            all_unique_usernames.add(username)
-                            if user_id:
-                                username_to_id[username] = user_id
-                            topic_total += 1
+                try:
+                    new_members = await self._store_topic_members(topic, users, state["users"])
+                except Exception as e:
+                    # Membership is bookkeeping; the page's users are still good candidates.
+                    # Counted as new so a re-crawl does not stop on a page it failed to record
+                    self.session.rollback()
+                    print(f"Error storing members of topic {topic}: {e} - continuing")
+                    new_members = len(users)
+                state["users"] += len(users)
+                pages.append((topic, users))
+                print(f"  {topic}: fetched page — {len(publishers['edges'])} edges — {state['users']} users so far")
+
+                if not publishers["edges"] or not page_info["hasNextPage"]:
+                    next_cursors[topic] = None
+                elif recrawl and users and not new_members:
+                    print(f"  {topic}: no new members on this page - re-crawl caught up")
+                    next_cursors[topic] = None
+                else:
+                    next_cursors[topic] = page_info["endCursor"]
+
+            for round_users in zip_longest(*(users for _, users in pages)):
+                for (topic, _), user in zip(pages, round_users):
+                    if user:
+                        yield topic, *user
+
+            # Cursors only advance once the whole round has been consumed, so a consumer
+            # stopping mid-round makes the next run re-read that page rather than skip it
+            for topic, cursor in next_cursors.items():
+                if cursor is None:
+                    print(f"Topic {topic} completed — {active[topic]['users']} users seen")
+                    del active[topic]
+                    progress.add("completed_topics", topic)
+                    progress.clear_cursor("topics", topic)
+                else:
+                    active[topic]["after"] = cursor
+                    progress.set_cursor("topics", topic, {"after": cursor, "rank": active[topic]["users"]})
 
-                    print(f"  Fetched page — {len(edges)} edges — {topic_total} users from this topic so far")
+            self._save_progress(progress)
 
-                    page_info = resp[0]["data"]["recommendedPublishers"]["pageInfo"]
-                    if not page_info["hasNextPage"]:
-                        break
-                    after = page_info["endCursor"]
+    @staticmethod
+    def _publisher_signals(node: Dict, rank: int) -> Dict[str, float]:
+        return {
+            "rank": rank,
+            "book_author": float(bool((node.get("verifications") or {}).get("isBookAuthor"))),
+            "member": float(bool((node.get("membership") or {}).get("tier"))),
+            "newsletter": float(bool(node.get("newsletterV3"))),
+            "bio": float(bool(node.get("bio"))),
+        }
 
-                    await asyncio.sleep(1.2)
+    @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=2, max=30), reraise=True)
+    async def _fetch_topic_posts_page(self, topic: str, paging: Dict) -> Dict:
+        return await self.api.get_topic_posts(topic, paginate_from=paging.get("from"), paginate_to=paging.get("to"))
+
+    async def stream_topic_posts(
+            self,
+            topics: List[str],
+            progress: ProgressStore,
+            seen: Optional[CompactIdSet] = None
+    ) -> AsyncIterator[tuple]:
+        """
+        Pages the TagRecommendedFeedQuery feed of every pending topic concurrently and
+        yields (topic, raw_post) round-robin across topics. Posts already seen in this
+        stream (on any topic) are dropped. Each topic stops after feed_max_pages pages
+        per run (0 = until the feed ends) and resumes from its saved cursor next run.
+        """
+        seen = seen if seen is not None else CompactIdSet()
+        active = {}
+        for topic in topics:
+            if progress.contains("completed_feed_topics", topic):
+                print(f"Feed of topic '{topic}' already processed - skipping")
+            else:
+                paging = progress.get_cursor("feed", topic) or {}
+                if paging:
+                    print(f"Resuming feed of topic '{topic}' from saved cursor")
+                active[topic] = {"paging": paging, "retry_at": 0.0, "pages": 0, "posts": 0}
+
+        while active:
+            now = time.monotonic()
+            ready = [topic for topic, state in active.items() if state["retry_at"] <= now]
+            if not ready:
+                await asyncio.sleep(min(state["retry_at"] for state in active.values()) - now)
+                continue
 
+            results = await asyncio.gather(
+                *(self._fetch_topic_posts_page(topic, active[topic]["paging"]) for topic in ready),
+                return_exceptions=True
+            )
+            pages = []
+            next_paging = {}
+            for topic, resp in zip(ready, results):
+                state = active[topic]
+                try:
+                    if isinstance(resp, Exception):
+                        raise resp
+                    feed = graphql_data(resp, "TagRecommendedFeedQuery")["tagFromSlug"]["viewerEdge"]["recommendedPostsFeed"]
+                    items = feed["items"]
+                    page_posts = [item["post"] for item in items if item.get("post")]
+                    next_page = (feed.get("pagingInfo") or {}).get("next")
                 except Exception as e:
-                    print(f"Error in topic {topic}: {e} - waiting 30 seconds...")
-                    await asyncio.sleep(30)
+                    print(f"Error in feed of topic {topic}: {e} - retrying it in 30 seconds...")
+                    state["retry_at"] = time.monotonic() + 30
+                    continue
+
+                posts = [post for post in page_posts if seen.add(post["id"])]
+                state["pages"] += 1
+                state["posts"] += len(posts)
+                pages.append((topic, posts))
+
+                if not items or not next_page or not next_page.get("from"):
+                    next_paging[topic] = None
+                else:
+                    next_paging[topic] = {"from": next_page["from"], "to": next_page.get("to")}
+
+            for round_posts in zip_longest(*(posts for _, posts in pages)):
+                for (topic, _), post in zip(pages, round_posts):
+                    if post:
+                        yield topic, post
+
+            for topic, paging in next_paging.items():
+                state = active[topic]
+                if paging is None:
+                    print(f"Feed of topic {topic} completed — {state['posts']} new posts seen")
+                    del active[topic]
+                    progress.add("completed_feed_topics", topic)
+                    progress.clear_cursor("feed", topic)
+                    continue
+                state["paging"] = paging
+                progress.set_cursor("feed", topic, paging)
+                if self.feed_max_pages and state["pages"] >= self.feed_max_pages:
+                    print(f"Feed of topic {topic}: {state['pages']} pages read this run — continuing next run")
+                    del active[topic]
 
-            progress["completed_topics"].append(topic)
             self._save_progress(progress)
-            print(f"Topic {topic} completed — {topic_total} new users collected")
 
-        print(f"\nAll topics processed — Total unique users found: {len(all_unique_usernames)}")
+    async def discover_feed_authors(self, topics: List[str], progress: ProgressStore) -> AsyncIterator[tuple]:
+        """
+        Yields (topic, username, user_id, signals) for every new author found in the
+        topic feeds; signals carries the claps of the post the author was found by.
+        """
+        authors = CompactIdSet()
+        async with aclosing(self.stream_topic_posts(topics, progress)) as posts:
+            async for topic, post in posts:
+                creator = post.get("creator") or {}
+                if creator.get("username") and creator.get("id") and authors.add(creator["id"]):
+                    yield topic, creator["username"], creator["id"], {"claps": post.get("clapCount") or 0}
+
+    async def discover_topic_members(self, topics: List[str], progress: ProgressStore) -> AsyncIterator[tuple]:
+        """
+        Yields (topic, username, user_id, signals) from the stored topic_users membership
+        in rank order, round-robin across topics, without calling the API. Each topic is
+        read in keyset-paged chunks off the (topic_slug, rank) index.
+        """
+        cursors: Dict[str, Optional[tuple]] = {topic: None for topic in topics}
+        while cursors:
+            for topic in list(cursors):
+                rows = self.topic_repo.member_page(topic, cursors[topic], limit=100)
+                if not rows:
+                    del cursors[topic]
+                    continue
+                cursors[topic] = (rows[-1].rank, rows[-1].id)
+                for row in rows:
+                    yield topic, row.username, row.id, {"rank": row.rank}
+
+    def _discover_users(self, topics: List[str], progress: ProgressStore) -> AsyncIterator[tuple]:
+        sources = []
+        if "members" in self.discovery_sources:
+            sources.append(self.discover_topic_members(topics, progress))
+        if "publishers" in self.discovery_sources:
+            sources.append(self.discover_topic_users(topics, progress))
+        if "feed" in self.discovery_sources:
+            sources.append(self.discover_feed_authors(topics, progress))
+        return sources[0] if len(sources) == 1 else merge_streams(*sources)
+
+    async def _select_best_users(self, topics: List[str], progress: ProgressStore) -> AsyncIterator[tuple]:
+        """
+        Runs discovery into a TargetSelector sized to the remaining target, then yields
+        the best (username, user_id) candidates, highest score first. Discovery stops
+        as soon as the selector is saturated.
+        """
+        selector = TargetSelector(
+            self.target_users - progress.count("collected_users"),
+            self.selection_weights,
+            stop_score=settings.SELECTION_STOP_SCORE,
+            patience=settings.SELECTION_PATIENCE
+        )
+        async with aclosing(self._discover_users(topics, progress)) as discovered:
+            async for topic, username, user_id, signals in discovered:
+                if progress.contains("collected_users", username):
+                    continue
+                selector.offer(topic, username, user_id, signals)
+                if selector.saturated:
+                    print(f"Selection saturated after {selector.offered} candidates - stopping discovery")
+                    break
 
-        selected_usernames = list(all_unique_usernames)[:self.target_users]
+        best = selector.best()
+        if best:
+            print(f"Selected {len(best)} of {selector.offered} candidates "
+                  f"(scores {best[-1].score:.2f} to {best[0].score:.2f})")
+        for candidate in best:
+            yield candidate.username, candidate.user_id
+
+    async def _stream_users(self, topics: List[str], progress: ProgressStore) -> AsyncIterator[tuple]:
+        async with aclosing(self._discover_users(topics, progress)) as discovered:
+            async for _, username, user_id, _ in discovered:
+                yield username, user_id
+
+    async def recrawl_topic_members(self, topics: List[str], progress: ProgressStore) -> None:
+        """
+        Walks every topic's publisher list again from the top and records membership in
+        topic_users, independent of the collection target. Each topic runs until the
+        first page that brings no new members (or its end).
+        """
+        print(f"\nRe-crawling membership of {len(topics)} topics")
+        seen = 0
+        async with aclosing(self.discover_topic_users(topics, progress, recrawl=True)) as members:
+            async for _ in members:
+                seen += 1
+        print(f"Topic re-crawl completed — {seen} members seen")
+
+    async def collect_users_from_topics(self, topics: List[str], progress: ProgressStore) -> AsyncIterator[str]:
+        """
+        Streams newly selected usernames until target_users have been collected in
+        total. Users from earlier runs are kept. In "stream" selection mode users are
+        taken in discovery order as soon as their topic page arrives; in "best" mode
+        the highest scoring candidates are picked first (see _select_best_users).
+        """
+        if progress.count("collected_users") >= self.target_users:
+            print(f"Target of {self.target_users} users already collected - skipping discovery")
+            return
 
-        if len(selected_usernames) < self.target_users:
-            print(f"Warning: Only {len(selected_usernames)} users available (target was {self.target_users})")
+        print(f"\nCollecting users from {len(topics)} topics concurrently")
+        if self.selection_mode == "best":
+            candidates = self._select_best_users(topics, progress)
+        else:
+            candidates = self._stream_users(topics, progress)
 
-        progress["collected_users"] = selected_usernames
+        async with aclosing(candidates):
+            async for username, user_id in candidates:
+                if progress.contains("collected_users", username):
+                    continue
 
-        print(f"Storing {len(selected_usernames)} selected users in database...")
-        for username in selected_usernames:
-            user_id = username_to_id.get(username)
-            existing = self.session.query(User).filter(User.username == username).first()
-            if not existing:
-                self.session.add(User(id=user_id, username=username))
+                await self._store_user_stub(user_id, username)
+
+                progress.add("collected_users", username)
+                yield username
+
+                if progress.count("collected_users") >= self.target_users:
+                    break
 
-        self.session.commit()
         self._save_progress(progress)
+        if progress.count("collected_users") < self.target_users:
+            print(f"Warning: Only {progress.count('collected_users')} users available (target was {self.target_users})")
+
+        print(f"Collection phase completed! Selected {progress.count('collected_users')} users for further processing")
 
-        print(f"Collection phase completed!")
-        print(f"Selected {len(selected_usernames)} users for further processing")
+    async def iter_target_users(self, topics: List[str], progress: ProgressStore) -> AsyncIterator[str]:
+        for username in progress.members("collected_users"):
+            yield username
+        async for username in self.collect_users_from_topics(topics, progress):
+            yield username
 
     @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=2, max=30), reraise=True)
     async def _fetch_user_details(self, username: str) -> Dict:
         return await self.api.get_user_data(username)
 
-    async def scrape_user_details(self, username: str, progress: Dict):
-        if username in progress["detailed_users"]:
-            return
+    async def scrape_user_details(self, username: str, progress: ProgressStore) -> Optional[bool]:
+        """Returns whether the stored profile changed, or None if it was not fetched."""
+        if progress.contains("detailed_users", username):
+            return None
 
         print(f"Fetching details and about for user: @{username}")
         try:
             response = await self._fetch_user_details(username)
             user_raw = response[0]["data"]["userResult"]
             if user_raw["__typename"] != "User":
-                return
+                return None
 
             user_data: UserData = extract_user_data(response[0])
             _, about_text = parse_user_about_to_text(user_data.about)
 
-            self.user_repo.save_or_update(user_data, about_text=about_text)
+            changed = bool(await self._store_users([user_data], {user_data.user_id: about_text}))
 
-            progress["detailed_users"].append(username)
+            progress.add("detailed_users", username)
             self._save_progress(progress)
-            print(f"Details for @{username} saved")
+            print(f"Details for @{username} {'saved' if changed else 'unchanged'}")
+            return changed
 
         except Exception as e:
+            self.session.rollback()
             print(f"Error fetching details for @{username}: {e} - continuing")
+            return None
 
     @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=2, max=30), reraise=True)
-    async def _fetch_user_posts_page(self, username: str) -> Dict:
-        return await self.api.get_user_posts(username)
-
-    async def scrape_user_posts(self, username: str, progress: Dict):
-        if username in progress["posts_scraped_users"]:
+    async def _fetch_user_posts_page(self, username: str, from_cursor: str = None) -> Dict:
+        return await self.api.get_user_posts(username, next_page_id=from_cursor)
+
+    async def scrape_user_posts(self, username: str, progress: ProgressStore):
+        """
+        Pages the author's homepage posts newest first, up to posts_max_pages pages
+        (0 = full history). Once an author's whole history has been stored, later
+        runs stop at the first page that contains an already stored post, so a
+        refresh costs one page per author. Pinned posts are ignored for that check
+        because they sit on the first page regardless of their age. An author cut off
+        by the page cap keeps a backfill cursor, and each later run continues from it
+        until the history is complete.
+        """
+        backfill = progress.get_cursor("posts_backfill", username)
+        if progress.contains("posts_scraped_users", username) and not backfill:
             return
 
-        print(f"Fetching latest 10 posts for: @{username}")
-        try:
-            response = await self._fetch_user_posts_page(username)
-            posts = response[0]["data"]["userResult"]["homepagePostsConnection"]["posts"][:10]
-
-            for p in posts:
-                post_data: PostData = extract_post_data(p)
-                self.post_repo.save_or_update(post_data)
+        max_pages = self.posts_max_pages
+        checkpoint = progress.get_cursor("posts", username) or {}
+        from_cursor = checkpoint.get("from")
+        pages = checkpoint.get("pages", 0)
+        total_saved = checkpoint.get("saved", 0)
+        changed = 0
+        incremental = progress.contains("posts_complete_users", username)
+        if from_cursor:
+            print(f"Resuming posts of @{username} from saved cursor ({total_saved} already saved)")
+        elif backfill:
+            from_cursor, total_saved = backfill["from"], backfill["saved"]
+            print(f"Continuing the post backfill of @{username} ({total_saved} already saved)")
+        else:
+            print(f"Fetching {'new' if incremental else 'latest'} posts for: @{username}")
 
-            progress["posts_scraped_users"].append(username)
+        try:
+            while not max_pages or pages < max_pages:
+                response = await self._fetch_user_posts_page(username, from_cursor)
+                connection = response[0]["data"]["userResult"]["homepagePostsConnection"]
+                posts = connection["posts"]
+
+                post_data: List[PostData] = [extract_post_data(p) for p in posts]
+                reached_known = False
+                if incremental:
+                    unpinned = [
+                        data.post_id for data, raw in zip(post_data, posts)
+                        if not (raw.get("pinnedAt") or raw.get("pinnedByCreatorAt"))
+                    ]
+                    reached_known = bool(await self._existing_post_ids(unpinned))
+                changed += len(await self._store_posts(post_data))
+                total_saved += len(post_data)
+                pages += 1
+
+                next_page = (connection.get("pagingInfo") or {}).get("next")
+                if not posts or not next_page or not next_page.get("from"):
+                    progress.add("posts_complete_users", username)
+                    break
+                if reached_known:
+                    break
+                from_cursor = next_page["from"]
+                progress.set_cursor("posts", username, {"from": from_cursor, "pages": pages, "saved": total_saved})
+                self._save_progress(progress)
+            else:
+                # Page cap reached with older pages left: this run is done, the history is not
+                progress.set_cursor("posts_backfill", username, {"from": from_cursor, "saved": total_saved})
+
+            if progress.contains("posts_complete_users", username):
+                progress.clear_cursor("posts_backfill", username)
+            progress.add("posts_scraped_users", username)
+            progress.clear_cursor("posts", username)
             self._save_progress(progress)
-            print(f"{len(posts)} posts saved for @{username}")
+            print(f"{total_saved} posts saved for @{username} ({pages} pages, {changed} new or changed)")
 
         except Exception as e:
+            self.session.rollback()
             print(f"Error fetching posts for @{username}: {e} - continuing")
 
     @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=2, max=30), reraise=True)
-    async def _fetch_full_post_content(self, post: Post) -> tuple:
-        response = await self.api.get_full_post_content(post.id)
-        return post, response
+    async def _fetch_full_post_content(self, post_id: str) -> Dict:
+        return await self.api.get_full_post_content(post_id)
 
-    async def scrape_full_post_contents(self, username: str, progress: Dict):
-        if username in progress["full_content_scraped_users"]:
+    async def _fetch_full_contents(self, post_ids: List[str]) -> tuple:
+        updated: List[str] = []
+        failed: List[str] = []
+
+        async def fetch(post_id: str):
+            async with self.full_content_slots:
+                try:
+                    response = await self._fetch_full_post_content(post_id)
+                    raw_content = response[0]["data"]["post"]["content"]["bodyModel"]
+                except Exception as e:
+                    print(f"Error fetching full content for post {post_id}: {e}")
+                    failed.append(post_id)
+                    return
+
+            # Commit every post on its own so a later failure never discards earlier results
+            try:
+                await self._store_post_content(post_id, json.dumps(raw_content))
+            except Exception as e:
+                self.session.rollback()
+                print(f"Error saving full content for post {post_id}: {e}")
+                failed.append(post_id)
+                return
+            updated.append(post_id)
+
+        await asyncio.gather(*(fetch(post_id) for post_id in post_ids))
+        return updated, failed
+
+    def _record_failed_posts(self, progress: ProgressStore, updated: List[str], failed: List[str]):
+        for post_id in updated:
+            progress.discard("failed_full_content_posts", post_id)
+        for post_id in failed:
+            progress.add("failed_full_content_posts", post_id)
+
+    async def scrape_full_post_contents(self, username: str, progress: ProgressStore):
+        if progress.contains("full_content_scraped_users", username):
             return
 
         print(f"Fetching full content for posts of: @{username}")
         try:
-            user = self.user_repo.get_by_username(username)
+            user = await self._get_user(username)
             if not user:
                 return
 
-            posts = user.posts.all()
-            updated_posts = 0
+            post_ids = await self._post_ids_without_content(user.id)
+            updated, failed = await self._fetch_full_contents(post_ids)
 
-            tasks = [self._fetch_full_post_content(post) for post in posts if not post.content]
-            results = await asyncio.gather(*tasks, return_exceptions=False)
-
-            for post, content in results:
-                raw_content = content[0]["data"]["post"]["content"]["bodyModel"]
-                post.content = json.dumps(raw_content)
-                self.session.merge(post)
-                updated_posts += 1
-
-            if updated_posts > 0:
-                self.session.commit()
-
-            progress["full_content_scraped_users"].append(username)
+            self._record_failed_posts(progress, updated, failed)
+            progress.add("full_content_scraped_users", username)
             self._save_progress(progress)
-            print(f"{updated_posts} posts updated with full content for @{username}")
+            print(f"{len(updated)} posts updated with full content for @{username}")
+            if failed:
+                print(f"{len(failed)} posts of @{username} failed - queued for retry")
 
         except Exception as e:
+            self.session.rollback()
             print(f"Error fetching full content for posts of @{username}: {e} - continuing")
 
+    async def retry_failed_full_contents(self, progress: ProgressStore):
+        post_ids = progress.members("failed_full_content_posts")
+        if not post_ids:
+            return
+
+        print(f"Retrying full content for {len(post_ids)} previously failed posts")
+        updated, failed = await self._fetch_full_contents(post_ids)
+        self._record_failed_posts(progress, updated, failed)
+        self._save_progress(progress)
+        print(f"{len(updated)} failed posts recovered, {len(failed)} still failing")
+
     @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=2, max=30), reraise=True)
     async def _fetch_followers_page(self, username: str, from_cursor: str = None) -> Dict:
         return await self.api.get_user_followers(username, followers_from=from_cursor)
 
-    async def scrape_user_followers(self, username: str, progress: Dict):
-        if username in progress["followers_scraped_users"]:
+    async def scrape_user_followers(self, username: str, progress: ProgressStore):
+        if progress.contains("followers_scraped_users", username):
             return
 
-        user = self.user_repo.get_by_username(username)
+        user = await self._get_user(username)
         if not user or user.followers_count == 0:
-            progress["followers_scraped_users"].append(username)
+            progress.add("followers_scraped_users", username)
             self._save_progress(progress)
             return
 
-        print(f"Fetching {user.followers_count} followers for @{username}")
-        from_cursor = None
-        total_saved = 0
-
-        while total_saved < 30:
+        # Keep plain values only; the ORM object may be expunged while this phase awaits
+        user_id, followers_count = user.id, user.followers_count
+        cap = self.followers_per_user
+        print(f"Fetching {min(followers_count, cap) if cap else followers_count} followers for @{username}")
+        checkpoint = progress.get_cursor("followers", username) or {}
+        from_cursor = checkpoint.get("from")
+        total_saved = checkpoint.get("saved", 0)
+        if from_cursor:
+            print(f"Resuming followers of @{username} from saved cursor ({total_saved} already saved)")
+
+        failed_attempts = 0
+        # cap == 0 means the full follower list
+        while not cap or total_saved < cap:
             try:
                 response = await self._fetch_followers_page(username, from_cursor)
                 followers = response[0]["data"]["userResult"]["followersUserConnection"]["users"]
                 print(f"fetched {len(followers)} number of {username} followers")
 
-                for follower_data in followers:
-                    print(f"total followers saved: {total_saved}")
-                    if total_saved >= 30:
-                        break
-                    follower_exists = self.session.query(User).filter(User.id == follower_data["id"]).first()
-                    if follower_data["__typename"] == "User" and not follower_exists:
-                        follower = User(
-                            id=follower_data["id"],
-                            username=follower_data["username"],
-                            name=follower_data.get("name"),
-                            bio=follower_data.get("bio")
-                        )
-                        self.session.add(follower)
-
-                        if user not in follower.following:
-                            follower.following.append(user)
-
-                        total_saved += 1
+                followers = [f for f in followers if f["__typename"] == "User"]
+                if cap:
+                    followers = followers[:cap - total_saved]
+                await self._store_followers(user_id, followers)
+                total_saved += len(followers)
+                print(f"total followers saved: {total_saved}")
 
-                self.session.commit()
                 next_page_info = response[0]["data"]["userResult"]["followersUserConnection"]["pagingInfo"].get("next")
                 if not next_page_info or not next_page_info.get("from"):
                     break
                 from_cursor = next_page_info["from"]
-
-                await asyncio.sleep(1)
+                failed_attempts = 0
+                progress.set_cursor("followers", username, {"from": from_cursor, "saved": total_saved})
+                self._save_progress(progress)
 
             except Exception as e:
+                self.session.rollback()
+                failed_attempts += 1
+                if failed_attempts >= settings.FOLLOWERS_PAGE_ATTEMPTS:
+                    # The cursor still points at this page, so the next run resumes here
+                    print(f"Giving up on followers for @{username} after {failed_attempts} failed attempts: {e}")
+                    return
                 print(f"Error fetching followers for @{username}: {e} - waiting 10 seconds...")
                 await asyncio.sleep(10)
 
-        progress["followers_scraped_users"].append(username)
+        progress.add("followers_scraped_users", username)
+        progress.clear_cursor("followers", username)
         self._save_progress(progress)
-        self.session.commit()
         print(f"{total_saved} followers saved for @{username}")
 
-    async def all_in_one(self, topics: List[str]):
-        progress = self._load_progress()
-        print(f"Starting full scrape - target: {self.target_users} users")
-        print(f"So far {len(progress['collected_users'])} users collected")
+    def print_change_stats(self):
+        for kind, counts in self.change_stats.items():
+            total = counts["changed"] + counts["unchanged"]
+            if total:
+                print(f"Change detection — {kind}: {counts['changed']} new or changed, "
+                      f"{counts['unchanged']} unchanged ({counts['unchanged'] / total:.0%} unchanged)")
 
-        await self.collect_users_from_topics(topics, progress)
+    def _print_proxy_stats(self):
+        proxy_stats = self.api.proxy_pool.stats()
+        if not proxy_stats:
+            return
 
-        for username in progress["collected_users"]:
+        print("\nProxy health:")
+        for row in proxy_stats:
+            latency = f"{row['latency_ewma']:.2f}s" if row["latency_ewma"] else "n/a"
+            state = "quarantined" if row["quarantined"] else "active"
+            print(
+                f"  {row['proxy']} — score {row['score']}, latency {latency}, "
+                f"errors {row['failures']}/{row['requests']}, bans {row['bans']}, {state}"
+            )
+
+    async def aclose(self):
+        # Drain pending writes before the API (and its event-loop resources) goes away
+        if self.writer:
+            await self.writer.close()
+        await self.api.aclose()
+        if self.async_engine:
+            await self.async_engine.dispose()
+
+    async def scrape_user(self, username: str, progress: ProgressStore):
+        try:
             await self.scrape_user_details(username, progress)
             await self.scrape_user_posts(username, progress)
             await self.scrape_full_post_contents(username, progress)
             await self.scrape_user_followers(username, progress)
 
             self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            print(f"Error scraping @{username}: {e} - continuing")
+        self._recycle_session()
+
+    def _recycle_session(self):
+        """
+        Called once per finished user. Every SESSION_RECYCLE_EVERY users the shared
+        Session is committed and emptied so its identity map does not grow with the
+        crawl. Phases only hold ids and scalars across awaits, never ORM instances.
+        """
+        self._users_since_recycle += 1
+        if self._users_since_recycle < self.session_recycle_every:
+            return
+        self._users_since_recycle = 0
+        self.session.commit()
+        self.session.expunge_all()
+
+    async def scrape_users(self, usernames: AsyncIterable[str], progress: ProgressStore):
+        # Workers share one Session safely because the event loop is single-threaded and
+        # every phase finishes its DB writes (and commits) without awaiting in between.
+        workers = max(1, self.concurrency)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+
+        async def feed():
+            async for username in usernames:
+                await queue.put(username)
+            for _ in range(workers):
+                await queue.put(None)
+
+        async def worker():
+            while (username := await queue.get()) is not None:
+                await self.scrape_user(username, progress)
+
+        if workers > 1:
+            print(f"Scraping users with {workers} concurrent workers")
+        await asyncio.gather(feed(), *(worker() for _ in range(workers)))
+
+    def build_pipeline(self, progress: ProgressStore) -> StagedPipeline:
+        # Phases handle their own errors; the progress key they mark tells whether they succeeded
+        phases = [
+            ("details", self.scrape_user_details, "detailed_users"),
+            ("posts", self.scrape_user_posts, "posts_scraped_users"),
+            ("full_content", self.scrape_full_post_contents, "full_content_scraped_users"),
+            ("followers", self.scrape_user_followers, "followers_scraped_users"),
+        ]
+
+        def bind(phase, progress_key: str, last: bool):
+            async def handler(username: str) -> bool:
+                try:
+                    await phase(username, progress)
+                    return progress.contains(progress_key, username)
+                finally:
+                    if last:
+                        self._recycle_session()
+            return handler
+
+        return StagedPipeline([
+            Stage(
+                name,
+                bind(phase, progress_key, last=index == len(phases) - 1),
+                workers=self.stage_workers.get(name, 1),
+                queue_size=settings.PIPELINE_QUEUE_SIZE
+            )
+            for index, (name, phase, progress_key) in enumerate(phases)
+        ])
+
+    async def enqueue_jobs(self, topics: List[str], job_repo: JobRepository):
+        progress = self._load_progress()
+        batch = []
+        total = 0
+        try:
+            topics = await self.resolve_topics(topics)
+            if self.topic_recrawl:
+                await self.recrawl_topic_members(topics, progress)
+            async for username in self.iter_target_users(topics, progress):
+                batch.append((username, "details"))
+                if len(batch) >= 100:
+                    total += job_repo.enqueue(batch)
+                    batch = []
+            total += job_repo.enqueue(batch)
+        finally:
+            progress.close()
+            await self.aclose()
+
+        print(f"Enqueued {total} new jobs — job table: {job_repo.counts()}")
 
-        print("\nScraping completed! Everything saved and resilient to errors.")
-        print(f"Progress file: {self.progress_file}")
\ No newline at end of file
+    async def all_in_one(self, topics: List[str]):
+        progress = self._load_progress()
+        started_at = time.monotonic()
+        print(f"Starting full scrape - target: {self.target_users} users")
+        print(f"So far {progress.count('collected_users')} users collected")
+
+        try:
+            topics = await self.resolve_topics(topics)
+            if self.topic_recrawl:
+                await self.recrawl_topic_members(topics, progress)
+            targets = self.iter_target_users(topics, progress)
+            if self.stage_workers:
+                await self.build_pipeline(progress).run(targets)
+            else:
+                await self.scrape_users(targets, progress)
+            await self.retry_failed_full_contents(progress)
+        finally:
+            await self.aclose()
+            progress.close()
+            if self.api.cache:
+                print(f"Response cache: {self.api.cache.stats()}")
+            if self.writer:
+                print(f"Write-behind: {self.writer.items} writes in {self.writer.batches} batches")
+            self.print_change_stats()
+            self._print_proxy_stats()
+
+        print(f"\nScraping completed in {time.monotonic() - started_at:.1f}s! Everything saved and resilient to errors.")
+        print(f"Progress file: {self.progress_file}")
@@ -0,0 +1,125 @@
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+
+@dataclass
+class Candidate:
+    username: str
+    user_id: Optional[str]
+    topics: Set[str] = field(default_factory=set)
+    best_rank: Optional[int] = None
+    signals: Dict[str, float] = field(default_factory=dict)
+    score: float = 0.0
+
+
+class TargetSelector:
+    """
+    Keeps the best `capacity` discovered users by a weighted score in a bounded
+    min-heap, so memory is O(capacity) however many users discovery surfaces.
+
+    score = overlap * <topics the user was seen in> + rank * <best rank seen>
+            + sum(weight * signal)
+
+    A user seen again in another topic has its score raised in place. Users that
+    were already evicted come back with only the overlap seen since then. The
+    selector is saturated once it is full and either its weakest member reaches
+    `stop_score` or `patience` candidates in a row failed to get in; discovery can
+    stop at that point.
+    """
+
+    def __init__(
+            self,
+            capacity: int,
+            weights: Dict[str, float],
+            stop_score: Optional[float] = None,
+            patience: int = 0
+    ):
+        self.capacity = max(0, capacity)
+        self.weights = weights
+        self.stop_score = stop_score
+        self.patience = patience
+
+        self._members: Dict[str, Candidate] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self.offered = 0
+        self.rejected_in_a_row = 0
+
+    def _score(self, candidate: Candidate) -> float:
+        score = self.weights.get("overlap", 0.0) * len(candidate.topics)
+        if candidate.best_rank is not None:
+            score += self.weights.get("rank", 0.0) * candidate.best_rank
+        for name, value in candidate.signals.items():
+            score += self.weights.get(name, 0.0) * value
+        return score
+
+    def _push(self, candidate: Candidate) -> None:
+        candidate.score = self._score(candidate)
+        heapq.heappush(self._heap, (candidate.score, next(self._sequence), candidate.username))
+        # Re-scored members leave stale entries behind; rebuild before they pile up
+        if len(self._heap) > 2 * self.capacity + 16:
+            self._heap = [(c.score, next(self._sequence), c.username) for c in self._members.values()]
+            heapq.heapify(self._heap)
+
+    def _weakest(self) -> Optional[Candidate]:
+        while self._heap:
+            score, _, username = self._heap[0]
+            candidate = self._members.get(username)
+            if candidate is not None and candidate.score == score:
+                return candidate
+            heapq.heappop(self._heap)
+        return None
+
+    @staticmethod
+    def _merge(candidate: Candidate, topic: str, signals: Dict[str, float]) -> None:
+        candidate.topics.add(topic)
+        rank = signals.get("rank")
+        if rank is not None and (candidate.best_rank is None or rank < candidate.best_rank):
+            candidate.best_rank = rank
+        for name, value in signals.items():
+            if name != "rank":
+                candidate.signals[name] = max(candidate.signals.get(name, 0.0), float(value))
+
+    def offer(self, topic: str, username: str, user_id: Optional[str], signals: Dict[str, float]) -> bool:
+        """Considers one discovered user; returns True if it is currently among the best."""
+        self.offered += 1
+        if not self.capacity:
+            return False
+
+        member = self._members.get(username)
+        if member is not None:
+            self._merge(member, topic, signals)
+            self._push(member)
+            self.rejected_in_a_row = 0
+            return True
+
+        candidate = Candidate(username=username, user_id=user_id)
+        self._merge(candidate, topic, signals)
+        candidate.score = self._score(candidate)
+
+        if len(self._members) >= self.capacity:
+            weakest = self._weakest()
+            if weakest is not None and candidate.score <= weakest.score:
+                self.rejected_in_a_row += 1
+                return False
+            heapq.heappop(self._heap)
+            del self._members[weakest.username]
+
+        self._members[username] = candidate
+        self._push(candidate)
+        self.rejected_in_a_row = 0
+        return True
+
+    @property
+    def saturated(self) -> bool:
+        if len(self._members) < self.capacity:
+            return False
+        if self.patience and self.rejected_in_a_row >= self.patience:
+            return True
+        weakest = self._weakest()
+        return self.stop_score is not None and weakest is not None and weakest.score >= self.stop_score
+
+    def best(self) -> List[Candidate]:
+        return sorted(self._members.values(), key=lambda candidate: candidate.score, reverse=True)
@@ -0,0 +1,94 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+SendFunc = Callable[[list, Optional[dict]], Awaitable[Any]]
+
+# Generated fresh for every HTTP request; a batch is one request, so it carries one value
+PER_REQUEST_HEADERS = frozenset({"x-apollo-operation-id", "x-client-date"})
+
+
+def batch_key(operation: dict, headers: Optional[dict]) -> Tuple[str, frozenset]:
+    shared = frozenset(
+        (name, value) for name, value in (headers or {}).items() if name.lower() not in PER_REQUEST_HEADERS
+    )
+    return operation["operationName"], shared
+
+
+class GraphQLBatcher:
+    """
+    Collects single GraphQL operations for a short window and ships them as one
+    JSON list, then hands every caller back its own entry of the response list.
+
+    Operations are grouped by operationName and headers so a batch always shares
+    the same headers and impersonation profile. Per-request headers
+    (PER_REQUEST_HEADERS) are left out of the grouping; the batch is sent with the
+    first caller's values for them.
+    """
+
+    def __init__(self, send: SendFunc, max_batch_size: int = 10, max_wait: float = 0.05):
+        self._send = send
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: Dict[tuple, List[Tuple[dict, Optional[dict], asyncio.Future]]] = {}
+        self._timers: Dict[tuple, asyncio.TimerHandle] = {}
+        self._in_flight: Set[asyncio.Task] = set()
+
+    async def submit(self, operation: dict, headers: dict | None = None) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = batch_key(operation, headers)
+
+        pending = self._pending.setdefault(key, [])
+        pending.append((operation, headers, future))
+
+        if len(pending) >= self.max_batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: tuple) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        items = self._pending.pop(key, [])
+        if not items:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._send_batch(items))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _send_batch(self, items: List[Tuple[dict, Optional[dict], asyncio.Future]]) -> None:
+        body = [operation for operation, _, _ in items]
+        headers = items[0][1]
+
+        try:
+            response = await self._send(body, headers)
+        except Exception as e:
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if not isinstance(response, list) or len(response) != len(items):
+            error = ValueError(
+                f"Batched {body[0]['operationName']} returned {type(response).__name__} "
+                f"for {len(items)} operations"
+            )
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, _, future), result in zip(items, response):
+            if not future.done():
+                future.set_result(result)
+
+    async def aclose(self) -> None:
+        for key in list(self._pending):
+            self._flush(key)
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
@@ -0,0 +1,18 @@
+class MediumApiError(Exception):
+    pass
+
+
+class ThrottledError(MediumApiError):
+    def __init__(self, operation: str, status_code: int, reason: str):
+        super().__init__(f"{operation} throttled ({status_code}): {reason}")
+        self.operation = operation
+        self.status_code = status_code
+        self.reason = reason
+
+
+class GraphQLError(MediumApiError):
+    def __init__(self, operation: str, errors: list):
+        messages = "; ".join(str(error.get("message", error)) for error in errors) if errors else "no data"
+        super().__init__(f"{operation} failed: {messages}")
+        self.operation = operation
+        self.errors = errors
@@ -0,0 +1,325 @@
+"""
+Local stand-in for Medium's GraphQL endpoint.
+
+Serves synthetic (or recorded) responses for the operations the scraper uses,
+so ScraperService.all_in_one can run end to end with no network:
+
+    python -m infrastructure.api.fake_server --port 8899 --users-per-topic 2000 --latency-ms 40
+    python main.py --reset --api-base-url http://127.0.0.1:8899/
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Optional, Dict, Any, List, Set, Tuple
+
+from infrastructure.api.transport import RecordedResponses
+
+
+def _stable_int(value: str) -> int:
+    return int(hashlib.md5(value.encode()).hexdigest()[:12], 16)
+
+
+def _user_id(username: str) -> str:
+    return hashlib.md5(username.encode()).hexdigest()[:12]
+
+
+class FakeMediumServer:
+    def __init__(
+            self,
+            host: str = "127.0.0.1",
+            port: int = 8899,
+            population: int = 10000,
+            users_per_topic: int = 500,
+            posts_per_user: int = 30,
+            followers_per_user: int = 60,
+            latency: float = 0.0,
+            throttle_rate: float = 0.0,
+            replay_path: Optional[str] = None
+    ):
+        self.host = host
+        self.port = port
+        self.population = population
+        self.users_per_topic = users_per_topic
+        self.posts_per_user = posts_per_user
+        self.followers_per_user = followers_per_user
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.recording = RecordedResponses(replay_path) if replay_path else None
+
+        self.requests = 0
+        self.operations: Dict[str, int] = {}
+        self.started_at = time.monotonic()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._stopping = False
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.started_at = time.monotonic()
+
+    async def stop(self) -> None:
+        if self._server:
+            self._stopping = True
+            self._server.close()
+            # Idle keep-alive connections would otherwise be cancelled at loop teardown
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        print(f"Fake Medium GraphQL server on http://{self.host}:{self.port}/_/graphql")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "requests": self.requests,
+            "requests_per_second": round(self.requests / elapsed, 2),
+            "operations": dict(self.operations),
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                if headers.get("expect", "").lower() == "100-continue":
+                    writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                length = int(headers.get("content-length", "0"))
+                raw_body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._respond(raw_body)
+                body = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: keep-alive\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            writer.close()
+            # asyncio's stream callback logs a traceback for a handler task that ends
+            # cancelled, so a shutdown started by stop() ends the handler normally
+            if not self._stopping:
+                raise
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _respond(self, raw_body: bytes) -> Tuple[int, Any]:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.throttle_rate and random.random() < self.throttle_rate:
+            return 429, {"errors": [{"message": "Too many requests"}]}
+
+        try:
+            operations = json.loads(raw_body or b"[]")
+        except json.JSONDecodeError:
+            return 400, {"errors": [{"message": "Invalid JSON body"}]}
+
+        results = []
+        for operation in operations:
+            name = operation.get("operationName", "")
+            self.operations[name] = self.operations.get(name, 0) + 1
+            recorded = self.recording.get(operation) if self.recording else None
+            results.append(recorded if recorded is not None else self.synthesize(name, operation.get("variables") or {}))
+        return 200, results
+
+    def synthesize(self, operation: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        handler = {
+            "ExploreTopicsQuery": self._explore_topics,
+            "WhoToFollowFeedQuery": self._who_to_follow,
+            "TagRecommendedFeedQuery": self._tag_feed,
+            "UserAboutQuery": self._user_about,
+            "UserProfileQuery": self._user_profile,
+            "UserFollowers": self._user_followers,
+            "FullPostQuery": self._full_post,
+        }.get(operation)
+        if handler is None:
+            return {"errors": [{"message": f"Unknown operation {operation}"}], "data": None}
+        return {"data": handler(variables)}
+
+    def _topic_usernames(self, topic: str) -> List[str]:
+        seed = _stable_int(topic)
+        return [f"user{(seed + i * 7919) % self.population}" for i in range(self.users_per_topic)]
+
+    def _user_node(self, username: str) -> Dict[str, Any]:
+        return {
+            "__typename": "User",
+            "id": _user_id(username),
+            "username": username,
+            "name": username.title(),
+            "bio": f"Synthetic bio of {username}",
+            "imageId": f"{_user_id(username)}.png",
+            "hasSubdomain": False,
+            "customDomainState": None,
+            "membership": None,
+            "verifications": {"isBookAuthor": _stable_int(username) % 50 == 0},
+        }
+
+    def _post_node(self, username: str, index: int) -> Dict[str, Any]:
+        user_id = _user_id(username)
+        return {
+            "__typename": "Post",
+            "id": f"{user_id}{index:04x}",
+            "creator": {"__typename": "User", "id": user_id, "username": username, "name": username.title()},
+            "title": f"Post {index} by {username}",
+            "firstPublishedAt": 1_700_000_000_000 - index * 86_400_000,
+            "extendedPreviewContent": {"subtitle": f"Subtitle {index}"},
+            "clapCount": _stable_int(f"{username}:{index}") % 1000,
+            "postResponses": {"count": index % 7},
+            "readingTime": 3.5,
+            "collection": None,
+        }
+
+    @staticmethod
+    def _paging_next(offset: int, limit: int, total: int) -> Optional[Dict[str, Any]]:
+        if offset + limit >= total:
+            return None
+        return {"from": str(offset + limit), "limit": limit}
+
+    def _explore_topics(self, variables: Dict[str, Any]) -> Dict[str, Any]:
+        return {"rootTags": [], "recommendedTags": {"edges": []}}
+
+    def _who_to_follow(self, variables: Dict[str, Any]) -> Dict[str, Any]:
+        usernames = self._topic_usernames(variables["tagSlug"])
+        offset = int(variables.get("after") or 0)
+        limit = int(variables.get("first") or 25)
+        page = usernames[offset:offset + limit]
+        return {
+            "tagFromSlug": {"id": variables["tagSlug"], "normalizedTagSlug": variables["tagSlug"]},
+            "recommendedPublishers": {
+                "edges": [{"node": self._user_node(username)} for username in page],
+                "pageInfo": {
+                    "hasNextPage": offset + limit < len(usernames),
+                    "endCursor": str(offset + limit),
+                    "startCursor": str(offset),
+                },
+            },
+        }
+
+    def _tag_feed(self, variables: Dict[str, Any]) -> Dict[str, Any]:
+        usernames = self._topic_usernames(variables["tagSlug"])
+        paging = variables.get("paging") or {}
+        offset = int(paging.get("from") or 0)
+        limit = int(paging.get("limit") or 10)
+        total = len(usernames) * 2
+        items = [
+            {"feedId": str(i), "post": self._post_node(usernames[i % len(usernames)], i // len(usernames))}
+            for i in range(offset, min(offset + limit, total))
+        ]
+        next_page = self._paging_next(offset, limit, total)
+        if next_page:
+            next_page["to"] = str(offset)
+        return {
+            "tagFromSlug": {
+                "id": variables["tagSlug"],
+                "viewerEdge": {"recommendedPostsFeed": {"items": items, "pagingInfo": {"next": next_page}}},
+            }
+        }
+
+    def _user_about(self, variables: Dict[str, Any]) -> Dict[str, Any]:
+        username = variables["username"]
+        user = self._user_node(username)
+        user.update({
+            "socialStats": {"followerCount": self.followers_per_user, "followingCount": 10},
+            "userMeta": {},
+            "about": json.dumps([{"children": [{"text": f"About {username}."}]}]),
+        })
+        return {"userResult": user}
+
+    def _user_profile(self, variables: Dict[str, Any]) -> Dict[str, Any]:
+        username = variables["username"]
+        offset = int(variables.get("homepagePostsFrom") or 0)
+        limit = int(variables.get("homepagePostsLimit") or 10)
+        posts = [self._post_node(username, i) for i in range(offset, min(offset + limit, self.posts_per_user))]
+        user = self._user_node(username)
+        user["homepagePostsConnection"] = {
+            "posts": posts,
+            "pagingInfo": {"next": self._paging_next(offset, limit, self.posts_per_user)},
+        }
+        return {"userResult": user}
+
+    def _user_followers(self, variables: Dict[str, Any]) -> Dict[str, Any]:
+        username = variables["username"]
+        paging = variables.get("paging") or {}
+        offset = int(paging.get("from") or 0)
+        limit = int(paging.get("limit") or 25)
+        seed = _stable_int(username)
+        users = [
+            self._user_node(f"user{(seed + j * 104729) % self.population}")
+            for j in range(offset, min(offset + limit, self.followers_per_user))
+        ]
+        user = self._user_node(username)
+        user["followersUserConnection"] = {
+            "users": users,
+            "pagingInfo": {"next": self._paging_next(offset, limit, self.followers_per_user)},
+        }
+        return {"userResult": user}
+
+    def _full_post(self, variables: Dict[str, Any]) -> Dict[str, Any]:
+        post_id = variables["postId"]
+        paragraphs = [{"name": str(i), "type": "P", "text": f"Paragraph {i} of {post_id}."} for i in range(12)]
+        return {
+            "post": {"__typename": "Post", "id": post_id, "content": {"bodyModel": {"paragraphs": paragraphs}}},
+            "meterPost": {"__typename": "MeteringInfo"},
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Local fake Medium GraphQL server",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--population", type=int, default=10000, help="Number of distinct synthetic users")
+    parser.add_argument("--users-per-topic", type=int, default=500)
+    parser.add_argument("--posts-per-user", type=int, default=30)
+    parser.add_argument("--followers-per-user", type=int, default=60)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Artificial latency added to every request")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--replay", default=None, help="Recording to answer from before synthesizing")
+    args = parser.parse_args()
+
+    server = FakeMediumServer(
+        host=args.host,
+        port=args.port,
+        population=args.population,
+        users_per_topic=args.users_per_topic,
+        posts_per_user=args.posts_per_user,
+        followers_per_user=args.followers_per_user,
+        latency=args.latency_ms / 1000,
+        throttle_rate=args.throttle_rate,
+        replay_path=args.replay
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print(f"\nServer stopped — {server.stats()}")
@@ -0,0 +1,122 @@
+import random
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict, Any
+
+
+@dataclass
+class ProxyStats:
+    proxy: str
+    latency_ewma: Optional[float] = None
+    error_rate_ewma: float = 0.0
+    requests: int = 0
+    failures: int = 0
+    bans: int = 0
+    consecutive_failures: int = 0
+    quarantine_count: int = 0
+    quarantined_until: float = 0.0
+
+    def is_quarantined(self, now: float) -> bool:
+        return self.quarantined_until > now
+
+
+class ProxyPool:
+    """
+    Routes requests across proxies by health score instead of uniformly.
+
+    Every proxy keeps an EWMA of latency and error rate; its weight is
+    (1 - error_rate) / latency. Proxies that fail `max_consecutive_failures`
+    times in a row, or return a ban signal, are quarantined for an exponentially
+    growing period and re-enter on probation: one success clears the record,
+    another failure sends them straight back.
+    """
+
+    def __init__(
+            self,
+            proxies: Optional[List[str]] = None,
+            alpha: float = 0.2,
+            max_consecutive_failures: int = 3,
+            quarantine_seconds: float = 30.0,
+            max_quarantine_seconds: float = 600.0
+    ):
+        self.alpha = alpha
+        self.max_consecutive_failures = max_consecutive_failures
+        self.quarantine_seconds = quarantine_seconds
+        self.max_quarantine_seconds = max_quarantine_seconds
+        self._stats: Dict[str, ProxyStats] = {proxy: ProxyStats(proxy) for proxy in proxies or []}
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def _score(self, stats: ProxyStats) -> float:
+        latency = stats.latency_ewma or self._default_latency()
+        return max(1.0 - stats.error_rate_ewma, 0.01) / max(latency, 0.001)
+
+    def _default_latency(self) -> float:
+        # Untried proxies get the pool median so they are neither starved nor favoured
+        known = sorted(s.latency_ewma for s in self._stats.values() if s.latency_ewma)
+        return known[len(known) // 2] if known else 1.0
+
+    def choose(self) -> Optional[str]:
+        if not self._stats:
+            return None
+
+        now = time.monotonic()
+        available = [s for s in self._stats.values() if not s.is_quarantined(now)]
+        if not available:
+            # Everything is quarantined: probe the one closest to release
+            return min(self._stats.values(), key=lambda s: s.quarantined_until).proxy
+
+        weights = [self._score(s) for s in available]
+        return random.choices(available, weights=weights, k=1)[0].proxy
+
+    def report_success(self, proxy: Optional[str], latency: float) -> None:
+        stats = self._stats.get(proxy)
+        if stats is None:
+            return
+
+        stats.requests += 1
+        stats.latency_ewma = latency if stats.latency_ewma is None else (
+            self.alpha * latency + (1 - self.alpha) * stats.latency_ewma
+        )
+        stats.error_rate_ewma *= 1 - self.alpha
+        stats.consecutive_failures = 0
+        stats.quarantine_count = 0
+
+    def report_failure(self, proxy: Optional[str], banned: bool = False) -> bool:
+        """Records a failed request; returns True if it sent the proxy into quarantine."""
+        stats = self._stats.get(proxy)
+        if stats is None:
+            return False
+
+        stats.requests += 1
+        stats.failures += 1
+        stats.error_rate_ewma = self.alpha + (1 - self.alpha) * stats.error_rate_ewma
+        stats.consecutive_failures += 1
+        if banned:
+            stats.bans += 1
+
+        on_probation = stats.quarantine_count > 0
+        if banned or on_probation or stats.consecutive_failures >= self.max_consecutive_failures:
+            self._quarantine(stats)
+            return True
+        return False
+
+    def _quarantine(self, stats: ProxyStats) -> None:
+        stats.quarantine_count += 1
+        duration = min(
+            self.quarantine_seconds * 2 ** (stats.quarantine_count - 1),
+            self.max_quarantine_seconds
+        )
+        stats.quarantined_until = time.monotonic() + duration
+        stats.consecutive_failures = 0
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        result = []
+        for stats in sorted(self._stats.values(), key=self._score, reverse=True):
+            row = asdict(stats)
+            row["score"] = round(self._score(stats), 3)
+            row["quarantined"] = stats.is_quarantined(now)
+            result.append(row)
+        return result
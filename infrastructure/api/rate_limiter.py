@@ -0,0 +1,102 @@
+import asyncio
+import time
+from typing import Optional, Dict, Tuple
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        # Waiters queue on the lock so tokens are handed out in arrival order
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def drain(self) -> None:
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class RequestBudget(TokenBucket):
+    """
+    Requests-per-hour allowance for work whose exact cost is only known afterwards.
+    reserve() waits until the estimated cost is affordable; spend() charges the real
+    cost, which may overdraw the bucket so later work waits until it is paid back.
+    """
+
+    def __init__(self, per_hour: float, burst: Optional[float] = None):
+        super().__init__(per_hour / 3600, capacity=burst or max(1.0, per_hour / 60))
+
+    async def reserve(self, cost: float) -> None:
+        cost = min(cost, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < cost:
+                await asyncio.sleep((cost - self.tokens) / self.rate)
+                self._refill()
+
+    def spend(self, cost: float) -> None:
+        self._refill()
+        self.tokens -= cost
+
+
+class AdaptiveRateLimiter:
+    """
+    Token buckets keyed by (proxy, operationName) with AIMD pacing: every
+    successful request adds `increase` requests/second to the bucket rate,
+    every throttle signal (429, 5xx, Cloudflare challenge) multiplies it by
+    `backoff` and empties the bucket.
+    """
+
+    def __init__(
+            self,
+            initial_rate: float = 1.0,
+            min_rate: float = 0.1,
+            max_rate: float = 10.0,
+            increase: float = 0.05,
+            backoff: float = 0.5,
+            burst: float = 1.0
+    ):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.backoff = backoff
+        self.burst = burst
+        self._buckets: Dict[Tuple[Optional[str], str], TokenBucket] = {}
+
+    def _bucket(self, proxy: Optional[str], operation: str) -> TokenBucket:
+        key = (proxy, operation)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.initial_rate, capacity=self.burst)
+            self._buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, proxy: Optional[str], operation: str) -> None:
+        await self._bucket(proxy, operation).acquire()
+
+    def on_success(self, proxy: Optional[str], operation: str) -> None:
+        bucket = self._bucket(proxy, operation)
+        bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+    def on_throttle(self, proxy: Optional[str], operation: str) -> None:
+        bucket = self._bucket(proxy, operation)
+        bucket.rate = max(self.min_rate, bucket.rate * self.backoff)
+        bucket.drain()
+
+    def rates(self) -> Dict[Tuple[Optional[str], str], float]:
+        return {key: bucket.rate for key, bucket in self._buckets.items()}
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from typing import Optional, Dict, Any
+
+# Seconds a cached response stays valid; None means it never expires
+DEFAULT_TTLS: Dict[str, Optional[int]] = {
+    "FullPostQuery": None,
+    "UserProfileQuery": 6 * 3600,
+    "UserAboutQuery": 24 * 3600,
+    "UserFollowers": 3600,
+    "WhoToFollowFeedQuery": 3600,
+    "TagRecommendedFeedQuery": 15 * 60,
+    "ExploreTopicsQuery": 24 * 3600,
+}
+
+
+class ResponseCache:
+    """
+    Content-addressed GraphQL response cache stored as zlib-compressed JSON in
+    a single SQLite file. Entries are keyed by sha256(operationName +
+    canonical variables), expire per operation and are evicted least recently
+    used first once the store grows past `max_bytes`.
+    """
+
+    def __init__(
+            self,
+            cache_dir: str,
+            max_bytes: int = 512 * 1024 * 1024,
+            ttls: Optional[Dict[str, Optional[int]]] = None
+    ):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "responses.sqlite3")
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " operation TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " payload BLOB NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(operation: dict) -> str:
+        variables = json.dumps(operation.get("variables") or {}, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(f"{operation['operationName']}:{variables}".encode()).hexdigest()
+
+    def is_cacheable(self, operation: dict) -> bool:
+        return operation.get("operationName") in self.ttls
+
+    def get(self, operation: dict) -> Optional[Any]:
+        if not self.is_cacheable(operation):
+            return None
+
+        key = self.make_key(operation)
+        row = self._conn.execute(
+            "SELECT created_at, payload FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        created_at, payload = row
+        ttl = self.ttls[operation["operationName"]]
+        now = time.time()
+        if ttl is not None and now - created_at > ttl:
+            self._delete(key)
+            self.misses += 1
+            return None
+
+        self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+        self.hits += 1
+        return json.loads(zlib.decompress(payload))
+
+    def put(self, operation: dict, response: Any) -> None:
+        if not self.is_cacheable(operation):
+            return
+        # Never cache error payloads, they would hide a transient failure for the whole TTL
+        if not isinstance(response, dict) or response.get("errors") or not response.get("data"):
+            return
+
+        key = self.make_key(operation)
+        payload = zlib.compress(json.dumps(response, separators=(",", ":")).encode(), 6)
+        now = time.time()
+
+        self._delete(key, commit=False)
+        self._conn.execute(
+            "INSERT INTO responses (key, operation, created_at, accessed_at, size, payload) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, operation["operationName"], now, now, len(payload), payload)
+        )
+        self._total_bytes += len(payload)
+        self._evict()
+        self._conn.commit()
+
+    def _delete(self, key: str, commit: bool = True) -> None:
+        row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return
+        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self._total_bytes -= row[0]
+        if commit:
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        # Evict down to 90% so a full cache does not pay for eviction on every put
+        target = self.max_bytes * 0.9
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if self._total_bytes <= target:
+                break
+            evicted.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"entries": entries, "bytes": self._total_bytes, "hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        self._conn.close()
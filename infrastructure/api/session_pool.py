@@ -0,0 +1,58 @@
+import asyncio
+from typing import Optional, Dict, Tuple
+
+from curl_cffi.const import CurlHttpVersion
+from curl_cffi.requests import AsyncSession
+
+
+class SessionPool:
+    """
+    Long-lived curl_cffi sessions, one per (proxy, impersonation profile).
+
+    Each session keeps its connections alive between requests and negotiates
+    HTTP/2 over TLS, so concurrent requests through the same proxy are
+    multiplexed instead of paying DNS, TCP and TLS setup every time.
+    """
+
+    def __init__(self, timeout: int = 10, max_clients: int = 20):
+        self.timeout = timeout
+        self.max_clients = max_clients
+        self._sessions: Dict[Tuple[Optional[str], str], AsyncSession] = {}
+        self._lock = asyncio.Lock()
+
+    async def get(self, proxy: Optional[str], impersonate: str) -> AsyncSession:
+        key = (proxy, impersonate)
+        session = self._sessions.get(key)
+        if session is not None:
+            return session
+
+        async with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = AsyncSession(
+                    impersonate=impersonate,
+                    proxies={"http": proxy, "https": proxy} if proxy else None,
+                    timeout=self.timeout,
+                    max_clients=self.max_clients,
+                    http_version=CurlHttpVersion.V2TLS,
+                )
+                self._sessions[key] = session
+            return session
+
+    async def discard(self, proxy: Optional[str], impersonate: Optional[str] = None) -> None:
+        """Closes the proxy's session for one impersonation profile, or all of them if None."""
+        keys = [
+            key for key in self._sessions
+            if key[0] == proxy and (impersonate is None or key[1] == impersonate)
+        ]
+        for key in keys:
+            await self._sessions.pop(key).close()
+
+    async def aclose(self) -> None:
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            await session.close()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
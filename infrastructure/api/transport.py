@@ -0,0 +1,108 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List
+
+from infrastructure.api.response_cache import ResponseCache
+from infrastructure.api.session_pool import SessionPool
+
+
+@dataclass
+class TransportResponse:
+    status_code: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class CurlTransport:
+    """Sends GraphQL bodies over the pooled curl_cffi sessions."""
+
+    def __init__(self, sessions: SessionPool):
+        self.sessions = sessions
+
+    async def post(self, url: str, body: list, headers: dict, proxy: Optional[str], impersonate: str):
+        session = await self.sessions.get(proxy, impersonate)
+        return await session.post(url, headers=headers, json=body)
+
+    async def aclose(self) -> None:
+        await self.sessions.aclose()
+
+
+class RecordedResponses:
+    """
+    One JSON line per GraphQL operation: {"operationName", "variables", "status_code", "response"}.
+    Lookups use the same content address as ResponseCache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._responses: Dict[str, Any] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self._add(json.loads(line))
+
+    def _add(self, record: Dict[str, Any]) -> None:
+        self._responses[ResponseCache.make_key(record)] = record["response"]
+
+    def get(self, operation: dict) -> Optional[Any]:
+        return self._responses.get(ResponseCache.make_key(operation))
+
+    def append(self, operation: dict, status_code: int, response: Any) -> None:
+        record = {
+            "operationName": operation["operationName"],
+            "variables": operation.get("variables") or {},
+            "status_code": status_code,
+            "response": response,
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._add(record)
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+
+class RecordingTransport:
+    """Wraps another transport and appends every successful operation response to a recording."""
+
+    def __init__(self, inner, path: str):
+        self.inner = inner
+        self.recording = RecordedResponses(path)
+
+    async def post(self, url: str, body: list, headers: dict, proxy: Optional[str], impersonate: str):
+        response = await self.inner.post(url, body, headers, proxy, impersonate)
+        if response.status_code == 200:
+            data = response.json()
+            if isinstance(data, list) and len(data) == len(body):
+                for operation, result in zip(body, data):
+                    self.recording.append(operation, response.status_code, result)
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport:
+    """Answers from a recording without touching the network; unknown operations get a GraphQL error."""
+
+    def __init__(self, path: str):
+        self.recording = RecordedResponses(path)
+        self.misses = 0
+
+    async def post(self, url: str, body: list, headers: dict, proxy: Optional[str], impersonate: str):
+        results: List[Any] = []
+        for operation in body:
+            result = self.recording.get(operation)
+            if result is None:
+                self.misses += 1
+                result = {"errors": [{"message": f"No recorded response for {operation['operationName']}"}]}
+            results.append(result)
+        return TransportResponse(200, json.dumps(results).encode())
+
+    async def aclose(self) -> None:
+        pass
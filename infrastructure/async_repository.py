@@ -0,0 +1,179 @@
+from typing import Optional, List, Tuple, Dict, Any
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from core.entities import UserData, PostData
+from infrastructure.db.models.post import Post
+from infrastructure.db.models.topic import topic_users
+from infrastructure.db.models.user import User, followers
+from infrastructure.repository import (
+    dialect_insert,
+    unique_rows,
+    displaced_username_holders,
+    upsert_statements,
+    upsert_link_statements,
+    insert_missing_statements,
+    follower_rows,
+    content_rows,
+    topic_member_rows,
+    user_row,
+    post_row,
+)
+
+
+def create_async_session_factory(engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def upsert_rows_async(session: AsyncSession, model, rows: List[Dict[str, Any]], update_columns: List[str]) -> List[str]:
+    rows = unique_rows(rows)
+    if not rows:
+        return []
+
+    insert = dialect_insert(session.bind.dialect.name)
+    ids: List[str] = []
+    if insert is None:
+        for row in rows:
+            await session.merge(model(**row))
+            ids.append(row["id"])
+        await session.commit()
+        return ids
+
+    for statement in upsert_statements(insert, model, rows, update_columns):
+        ids.extend((await session.execute(statement)).scalars().all())
+    await session.commit()
+    return ids
+
+
+async def insert_missing_rows_async(session: AsyncSession, table, rows: List[Dict[str, Any]]) -> None:
+    if not rows:
+        return
+
+    insert = dialect_insert(session.bind.dialect.name)
+    if insert is None:
+        for row in rows:
+            try:
+                async with session.begin_nested():
+                    await session.execute(table.insert().values(**row))
+            except IntegrityError:
+                pass
+        return
+
+    for statement in insert_missing_statements(insert, table, rows):
+        await session.execute(statement)
+
+
+class AsyncUserRepository:
+    """
+    Async counterpart of UserRepository. Every call checks a connection out of the
+    pool on its own AsyncSession, so any number of coroutines can use one repository
+    concurrently while their queries overlap with network I/O.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def get_by_username(self, username: str) -> Optional[User]:
+        async with self.session_factory() as session:
+            return (await session.execute(select(User).where(User.username == username))).scalars().first()
+
+    async def get_by_id(self, user_id: str) -> Optional[User]:
+        async with self.session_factory() as session:
+            return await session.get(User, user_id)
+
+    async def bulk_upsert_users(self, users: List[UserData], about_texts: Optional[Dict[str, str]] = None) -> List[str]:
+        if not users:
+            return []
+        about_texts = about_texts or {}
+        rows = unique_rows(unique_rows([
+            user_row(user_data, about_texts.get(user_data.user_id)) for user_data in users
+        ]), key="username")
+        async with self.session_factory() as session:
+            holders = (await session.execute(
+                select(User.id, User.username).where(User.username.in_([row["username"] for row in rows]))
+            )).all()
+            displaced = displaced_username_holders(rows, holders)
+            if displaced:
+                await session.execute(update(User).where(User.id.in_(displaced)).values(username=None))
+            return await upsert_rows_async(session, User, rows, [column for column in rows[0] if column != "id"])
+
+    async def insert_missing_users(self, rows: List[Dict[str, Any]]) -> None:
+        async with self.session_factory() as session:
+            await insert_missing_rows_async(session, User.__table__, unique_rows(rows))
+            await session.commit()
+
+
+class AsyncPostRepository:
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def bulk_upsert_posts(self, posts: List[PostData]) -> List[str]:
+        if not posts:
+            return []
+        rows = [post_row(post_data) for post_data in posts]
+        async with self.session_factory() as session:
+            return await upsert_rows_async(session, Post, rows, [column for column in rows[0] if column != "id"])
+
+    async def get_ids_without_content(self, author_id: str) -> List[str]:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(Post.id).where(Post.author_id == author_id, Post.content.is_(None))
+            )
+            return list(result.scalars().all())
+
+    async def get_existing_ids(self, post_ids: List[str]) -> set:
+        async with self.session_factory() as session:
+            return set((await session.execute(select(Post.id).where(Post.id.in_(post_ids)))).scalars().all())
+
+    async def set_content(self, post_id: str, content: str) -> None:
+        await self.bulk_set_content([(post_id, content)])
+
+    async def bulk_set_content(self, contents: List[Tuple[str, str]]) -> None:
+        if not contents:
+            return
+        async with self.session_factory() as session:
+            await session.execute(update(Post), content_rows(contents))
+            await session.commit()
+
+
+class AsyncFollowRepository:
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def bulk_insert_followers(self, stub_users: List[Dict[str, Any]], edges: List[Tuple[str, str]]) -> None:
+        stub_users, edge_rows = follower_rows(stub_users, edges)
+        async with self.session_factory() as session:
+            await insert_missing_rows_async(session, User.__table__, stub_users)
+            await insert_missing_rows_async(session, followers, edge_rows)
+            await session.commit()
+
+
+class AsyncTopicRepository:
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def store_members(self, topic: str, members: List[Tuple[str, str]], start_rank: int) -> int:
+        if not members:
+            return 0
+        stub_users, links = topic_member_rows(topic, members, start_rank)
+        async with self.session_factory() as session:
+            existing = set((await session.execute(
+                select(topic_users.c.user_id).where(
+                    topic_users.c.topic_slug == topic,
+                    topic_users.c.user_id.in_([link["user_id"] for link in links])
+                )
+            )).scalars().all())
+
+            await insert_missing_rows_async(session, User.__table__, stub_users)
+            insert = dialect_insert(session.bind.dialect.name)
+            if insert is None:
+                await insert_missing_rows_async(session, topic_users, links)
+            else:
+                for statement in upsert_link_statements(
+                        insert, topic_users, links, ["topic_slug", "user_id"], ["rank", "last_seen_at"]
+                ):
+                    await session.execute(statement)
+            await session.commit()
+        return len(links) - len(existing)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, UniqueConstraint, Index
+from infrastructure.db.base import Base
+
+
+class ScrapeJob(Base):
+    __tablename__ = "scrape_jobs"
+    __table_args__ = (
+        UniqueConstraint("username", "phase", name="uq_scrape_jobs_username_phase"),
+        Index("ix_scrape_jobs_status_lease", "status", "lease_expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    username = Column(String, nullable=False)
+    phase = Column(String, nullable=False)
+
+    status = Column(String, nullable=False, default="pending")
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<ScrapeJob {self.phase} @{self.username} ({self.status})>"
@@ -1,6 +1,6 @@
 from sqlalchemy import Column, String, Integer, Table, Text, BigInteger, Boolean, ForeignKey, DateTime, Numeric
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from infrastructure.db.base import Base
 
 
@@ -17,6 +17,9 @@ class Post(Base):
     responses_count = Column(Integer, default=0)
     reading_time = Column(Numeric(precision=5, scale=2), default=0.00)
     collection_id = Column(String, nullable=True)
-    content = Column(JSONB, nullable=True)
+    # Hash of the mapped listing fields; upserts leave the row alone while it matches
+    fingerprint = Column(String(32), nullable=True)
+    # Full bodies are large; only load them when explicitly asked for (undefer / load_only)
+    content = deferred(Column(JSONB, nullable=True))
 
     author = relationship("User", back_populates="posts")
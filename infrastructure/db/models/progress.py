@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Text, DateTime
+from infrastructure.db.base import Base
+
+
+class UserProgress(Base):
+    __tablename__ = "user_progress"
+
+    username = Column(String, primary_key=True)
+
+    # ProgressStore.snapshot() of everything scraped for this user: phase markers,
+    # page cursors and posts whose full content failed
+    state = Column(Text, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<UserProgress @{self.username} ({self.updated_at})>"
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Integer, DateTime, Index
+from infrastructure.db.base import Base
+
+
+class UserRefresh(Base):
+    __tablename__ = "user_refresh"
+    __table_args__ = (
+        Index("ix_user_refresh_phase_attempted", "phase", "attempted_at"),
+    )
+
+    username = Column(String, primary_key=True)
+    phase = Column(String, primary_key=True)
+
+    # Last successful fetch; attempted_at also moves on failures so they back off
+    fetched_at = Column(DateTime(timezone=True), nullable=True)
+    attempted_at = Column(DateTime(timezone=True), nullable=True)
+    requests = Column(Integer, nullable=False, default=0)
+    refreshes = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<UserRefresh {self.phase} @{self.username} ({self.fetched_at})>"
@@ -1,10 +1,26 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, Table, DateTime
 from sqlalchemy.orm import relationship
 from infrastructure.db.base import Base
 
 
+# Which users a topic's "who to follow" list surfaced, and at which position (rank)
+topic_users = Table(
+    "topic_users",
+    Base.metadata,
+    Column("topic_slug", String, primary_key=True),
+    Column("user_id", String, ForeignKey("users.id"), primary_key=True),
+    Column("rank", Integer, nullable=False),
+    Column("last_seen_at", DateTime(timezone=True), nullable=True),
+    Index("ix_topic_users_topic_rank", "topic_slug", "rank"),
+)
+
+
 class Topic(Base):
     __tablename__ = "topics"
+    __table_args__ = (
+        # text_pattern_ops lets Postgres serve `path LIKE 'prefix%'` from the btree index
+        Index("ix_topics_path", "path", postgresql_ops={"path": "text_pattern_ops"}),
+    )
 
     id = Column(String, primary_key=True)
 
@@ -13,9 +29,14 @@ class Topic(Base):
 
     parent_id = Column(String, ForeignKey("topics.id"), nullable=True)
 
+    # Materialized path of topic ids (not slugs) from the root, e.g. "/technology/tech-companies/tiktok/"
+    # for the topic whose slug is "tik-tok"; every descendant has the topic's path as a prefix
+    path = Column(String, nullable=False)
+    depth = Column(Integer, nullable=False, default=0)
+
     children = relationship("Topic", back_populates="parent", lazy="dynamic")
 
     parent = relationship("Topic", remote_side=[id], back_populates="children")  # type: ignore[arg-type]
 
     def __repr__(self):
-        return f"<Topic {self.display_title} ({self.normalized_slug})>"
\ No newline at end of file
+        return f"<Topic {self.display_title} ({self.normalized_slug})>"
@@ -29,6 +29,8 @@ class User(Base):
     user_meta = Column(JSONB, nullable=True)
 
     about = Column(Text, nullable=True)
+    # Hash of the mapped profile fields; upserts leave the row alone while it matches
+    fingerprint = Column(String(32), nullable=True)
 
     following = relationship(
         "User",
@@ -50,4 +52,4 @@ class User(Base):
             self.following.remove(user)
 
     def is_following(self, user):
-        return self.following.filter(followers.c.followed_id == user.id).count() > 0
\ No newline at end of file
+        return self.following.filter(followers.c.followed_id == user.id).first() is not None
\ No newline at end of file
@@ -0,0 +1,224 @@
+import json
+import os
+import time
+from typing import Callable, Optional, Dict, Any, List
+
+DEFAULT_SETS = (
+    "collected_users",
+    "completed_topics",
+    "completed_feed_topics",
+    "detailed_users",
+    "posts_scraped_users",
+    "posts_complete_users",
+    "followers_scraped_users",
+    "full_content_scraped_users",
+    "failed_full_content_posts",
+)
+
+
+class ProgressStore:
+    """
+    Scrape checkpoint kept as a JSON snapshot plus an append-only journal.
+
+    The snapshot uses the same layout as the old scraper_progress.json (one list per
+    key), so existing progress files load unchanged. Every mutation is appended to
+    `<path>.journal` as one JSON line; lines are written to the OS on every flush()
+    and fsynced in batches. compact() folds the journal into a new snapshot with an
+    atomic rename. Journal operations are idempotent, so a crash between the rename
+    and the journal truncation just replays them onto the new snapshot.
+
+    With path=None the store is purely in-memory; `on_flush`, if given, then receives
+    a snapshot() on every flush() that follows a change, so callers can persist it
+    elsewhere (e.g. one row per user).
+    """
+
+    def __init__(
+            self,
+            path: Optional[str],
+            fsync_every: int = 200,
+            fsync_interval: float = 2.0,
+            compact_every: int = 50000,
+            on_flush: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self.path = path
+        self.journal_path = f"{path}.journal" if path else None
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+
+        # dicts double as insertion-ordered sets
+        self._sets: Dict[str, Dict[str, None]] = {key: {} for key in DEFAULT_SETS}
+        self._values: Dict[str, Any] = {}
+
+        self._pending: List[str] = []
+        self._unsynced = 0
+        self._journal_entries = 0
+        self._last_sync = time.monotonic()
+        self._journal = None
+        self.on_flush = on_flush
+        self._changed = False
+
+        if path:
+            self._load()
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    @staticmethod
+    def reset(path: str) -> None:
+        for file_path in (path, f"{path}.journal"):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    @classmethod
+    def read(cls, path: str) -> "ProgressStore":
+        """
+        Loads another process's progress file into an in-memory store without touching
+        the files: a torn journal line is skipped rather than truncated, and nothing is
+        ever appended or compacted.
+        """
+        store = cls(None)
+        store.path, store.journal_path = path, f"{path}.journal"
+        try:
+            store._load(truncate=False)
+        finally:
+            store.path = store.journal_path = None
+        return store
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The compacted layout: one list per set key plus a "values" dict."""
+        snapshot: Dict[str, Any] = {key: list(members) for key, members in self._sets.items()}
+        snapshot["values"] = dict(self._values)
+        return snapshot
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        for key, value in snapshot.items():
+            if key == "values":
+                self._values.update(value)
+            elif isinstance(value, list):
+                self._sets[key] = dict.fromkeys(value)
+
+    def _load(self, truncate: bool = True) -> None:
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.restore(json.load(f))
+
+        if os.path.exists(self.journal_path):
+            valid_bytes = 0
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Torn final line from a crash mid-write; everything before it is intact
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    self._apply(entry)
+                    self._journal_entries += 1
+                    valid_bytes += len(line)
+            if truncate and valid_bytes < os.path.getsize(self.journal_path):
+                os.truncate(self.journal_path, valid_bytes)
+
+    def _apply(self, entry: list) -> None:
+        op, key = entry[0], entry[1]
+        if op == "add":
+            self._sets.setdefault(key, {})[entry[2]] = None
+        elif op == "discard":
+            self._sets.setdefault(key, {}).pop(entry[2], None)
+        elif op == "set":
+            self._values[key] = entry[2]
+        elif op == "unset":
+            self._values.pop(key, None)
+
+    def _record(self, entry: list) -> None:
+        self._apply(entry)
+        self._changed = True
+        if self._journal:
+            self._pending.append(json.dumps(entry, ensure_ascii=False))
+
+    def contains(self, key: str, member: str) -> bool:
+        return member in self._sets.get(key, ())
+
+    def add(self, key: str, member: str) -> bool:
+        if self.contains(key, member):
+            return False
+        self._record(["add", key, member])
+        return True
+
+    def discard(self, key: str, member: str) -> None:
+        if self.contains(key, member):
+            self._record(["discard", key, member])
+
+    def members(self, key: str) -> List[str]:
+        return list(self._sets.get(key, ()))
+
+    def count(self, key: str) -> int:
+        return len(self._sets.get(key, ()))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._values.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        if self._values.get(key) != value:
+            self._record(["set", key, value])
+
+    def unset(self, key: str) -> None:
+        if key in self._values:
+            self._record(["unset", key])
+
+    def get_cursor(self, phase: str, key: str) -> Any:
+        return self._values.get(f"cursor:{phase}:{key}")
+
+    def set_cursor(self, phase: str, key: str, cursor: Any) -> None:
+        self.set(f"cursor:{phase}:{key}", cursor)
+
+    def clear_cursor(self, phase: str, key: str) -> None:
+        self.unset(f"cursor:{phase}:{key}")
+
+    def flush(self, force_sync: bool = False) -> None:
+        if self.on_flush and self._changed:
+            self.on_flush(self.snapshot())
+        self._changed = False
+        if not self._journal:
+            return
+
+        if self._pending:
+            self._journal.write("\n".join(self._pending) + "\n")
+            self._journal.flush()
+            self._unsynced += len(self._pending)
+            self._journal_entries += len(self._pending)
+            self._pending.clear()
+
+        due = self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval
+        if self._unsynced and (force_sync or due):
+            os.fsync(self._journal.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+        if self._journal_entries >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        if not self.path:
+            return
+
+        snapshot = self.snapshot()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        self._journal.close()
+        self._journal = open(self.journal_path, "w", encoding="utf-8")
+        self._pending.clear()
+        self._unsynced = 0
+        self._journal_entries = 0
+
+    def close(self) -> None:
+        if not self._journal:
+            return
+        self.flush(force_sync=True)
+        self.compact()
+        self._journal.close()
+        self._journal = None
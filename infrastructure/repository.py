@@ -1,12 +1,202 @@
+import hashlib
 import json
-from datetime import datetime
-from typing import Optional, List
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Tuple, Dict, Any
 
+from sqlalchemy import or_, and_, func, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from core.entities import UserData, PostData
+from infrastructure.db.models.job import ScrapeJob
 from infrastructure.db.models.post import Post
-from infrastructure.db.models.user import User
+from infrastructure.db.models.progress import UserProgress
+from infrastructure.db.models.refresh import UserRefresh
+from infrastructure.db.models.topic import Topic, topic_users
+from infrastructure.db.models.user import User, followers
+
+
+UPSERT_CHUNK_SIZE = 500
+
+
+def dialect_insert(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def _dialect_insert(session: Session):
+    return dialect_insert(session.get_bind().dialect.name)
+
+
+def unique_rows(rows: List[Dict[str, Any]], key: str = "id") -> List[Dict[str, Any]]:
+    # Last row wins for duplicate ids; Postgres refuses to update the same row twice in one statement
+    return list({row[key]: row for row in rows}.values())
+
+
+def upsert_statements(insert, model, rows: List[Dict[str, Any]], update_columns: List[str]):
+    """
+    For fingerprinted tables the update only fires when the fingerprint differs, so
+    unchanged rows are neither rewritten nor returned: RETURNING yields the ids that
+    were inserted or changed.
+    """
+    table = model.__table__
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        statement = insert(table).values(rows[start:start + UPSERT_CHUNK_SIZE])
+        changed = None
+        if "fingerprint" in update_columns:
+            changed = table.c.fingerprint.is_distinct_from(statement.excluded.fingerprint)
+        yield statement.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={column: statement.excluded[column] for column in update_columns},
+            where=changed
+        ).returning(table.c.id)
+
+
+def upsert_link_statements(insert, table, rows: List[Dict[str, Any]], key_columns: List[str], update_columns: List[str]):
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        statement = insert(table).values(rows[start:start + UPSERT_CHUNK_SIZE])
+        yield statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={column: statement.excluded[column] for column in update_columns}
+        )
+
+
+def insert_missing_statements(insert, table, rows: List[Dict[str, Any]]):
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        yield insert(table).values(rows[start:start + UPSERT_CHUNK_SIZE]).on_conflict_do_nothing()
+
+
+def follower_rows(stub_users: List[Dict[str, Any]], edges: List[Tuple[str, str]]) -> tuple:
+    return unique_rows(stub_users), [
+        {"follower_id": follower_id, "followed_id": followed_id}
+        for follower_id, followed_id in dict.fromkeys(edges)
+    ]
+
+
+def topic_member_rows(topic: str, members: List[Tuple[str, str]], start_rank: int) -> tuple:
+    """(user_id, username) pairs in discovery order -> (stub user rows, topic_users rows)."""
+    now = datetime.now(timezone.utc)
+    stub_users = unique_rows([{"id": user_id, "username": username} for user_id, username in members])
+    links = unique_rows([
+        {"topic_slug": topic, "user_id": user_id, "rank": start_rank + index, "last_seen_at": now}
+        for index, (user_id, _) in enumerate(members)
+    ], key="user_id")
+    return stub_users, links
+
+
+def upsert_rows(session: Session, model, rows: List[Dict[str, Any]], update_columns: List[str]) -> List[str]:
+    """
+    INSERT ... ON CONFLICT (id) DO UPDATE ... RETURNING id, one statement per chunk;
+    returns the ids actually written (see upsert_statements). Dialects without
+    ON CONFLICT fall back to session.merge per row and report every id as written.
+    """
+    rows = unique_rows(rows)
+    if not rows:
+        return []
+
+    insert = _dialect_insert(session)
+    ids: List[str] = []
+    if insert is None:
+        for row in rows:
+            session.merge(model(**row))
+            ids.append(row["id"])
+        session.commit()
+        return ids
+
+    for statement in upsert_statements(insert, model, rows, update_columns):
+        ids.extend(session.execute(statement).scalars().all())
+    session.commit()
+    return ids
+
+
+def displaced_username_holders(rows: List[Dict[str, Any]], holders: List[Tuple[str, str]]) -> List[str]:
+    """
+    Ids of stored users whose username is claimed by a different id in rows. Usernames
+    are unique at any one time, so the stored holder is stale (a renamed or deleted
+    account) and has to give the username up before the upsert can write it.
+    """
+    claimed = {row["username"]: row["id"] for row in rows}
+    return [user_id for user_id, username in holders if claimed.get(username, user_id) != user_id]
+
+
+def release_displaced_usernames(session: Session, rows: List[Dict[str, Any]]) -> None:
+    """Clears the username of every user displaced by rows (see displaced_username_holders). Does not commit."""
+    holders = session.query(User.id, User.username).filter(User.username.in_([row["username"] for row in rows])).all()
+    displaced = displaced_username_holders(rows, holders)
+    if displaced:
+        session.query(User).filter(User.id.in_(displaced)).update({User.username: None}, synchronize_session=False)
+
+
+def insert_missing_rows(session: Session, table, rows: List[Dict[str, Any]]) -> None:
+    """
+    Multi-row INSERT ... ON CONFLICT DO NOTHING, one statement per chunk; rows that
+    already exist are skipped. Does not commit. Dialects without ON CONFLICT insert
+    row by row inside a savepoint and skip the ones that violate a constraint.
+    """
+    if not rows:
+        return
+
+    insert = _dialect_insert(session)
+    if insert is None:
+        for row in rows:
+            try:
+                with session.begin_nested():
+                    session.execute(table.insert().values(**row))
+            except IntegrityError:
+                pass
+        return
+
+    for statement in insert_missing_statements(insert, table, rows):
+        session.execute(statement)
+
+
+def content_rows(contents: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    return [{"id": post_id, "content": content} for post_id, content in dict(contents).items()]
+
+
+def row_fingerprint(row: Dict[str, Any]) -> str:
+    payload = json.dumps({key: value for key, value in row.items() if key != "fingerprint"}, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def fingerprinted(row: Dict[str, Any]) -> Dict[str, Any]:
+    row["fingerprint"] = row_fingerprint(row)
+    return row
+
+
+def user_row(user_data: UserData, about_text: Optional[str] = None) -> Dict[str, Any]:
+    return fingerprinted({
+        "id": user_data.user_id,
+        "username": user_data.username,
+        "name": user_data.name,
+        "bio": user_data.bio,
+        "image_id": user_data.image_id,
+        "subdomain": user_data.subdomain,
+        "is_book_author": user_data.is_book_author,
+        "followers_count": user_data.follower_count,
+        "following_count": user_data.following_count,
+        "user_meta": json.dumps(user_data.user_meta),
+        "about": about_text if about_text is not None else user_data.about,
+    })
+
+
+def post_row(post_data: PostData) -> Dict[str, Any]:
+    return fingerprinted({
+        "id": post_data.post_id,
+        "author_id": post_data.author_id,
+        "title": post_data.title,
+        "published_at": datetime.fromtimestamp(int(post_data.published_at) / 1000),
+        "subtitle": post_data.subtitle,
+        "clap_count": post_data.clap_count,
+        "responses_count": post_data.responses_count,
+        "reading_time": post_data.reading_time,
+        "collection_id": post_data.collection_id,
+    })
 
 
 class UserRepository:
@@ -19,8 +209,11 @@ class UserRepository:
     def get_by_id(self, user_id: str) -> Optional[User]:
         return self.session.query(User).filter(User.id == user_id).first()
 
-    def save_or_update(self, user_data: UserData) -> User:
+    def save_or_update(self, user_data: UserData, about_text: Optional[str] = None) -> User:
         user = self.get_by_username(user_data.username)
+        fingerprint = user_row(user_data, about_text)["fingerprint"]
+        if user and user.fingerprint == fingerprint:
+            return user
         if not user:
             user = User(
                 id=user_data.user_id,
@@ -36,11 +229,22 @@ class UserRepository:
         user.followers_count = user_data.follower_count
         user.following_count = user_data.following_count
         user.user_meta = json.dumps(user_data.user_meta)
-        user.about = user_data.about
+        user.about = about_text if about_text is not None else user_data.about
+        user.fingerprint = fingerprint
 
         self.session.commit()
         return user
 
+    def bulk_upsert_users(self, users: List[UserData], about_texts: Optional[Dict[str, str]] = None) -> List[str]:
+        if not users:
+            return []
+        about_texts = about_texts or {}
+        rows = [user_row(user_data, about_texts.get(user_data.user_id)) for user_data in users]
+        # The conflict target is id only, so a username moving to another id is resolved up front
+        rows = unique_rows(unique_rows(rows), key="username")
+        release_displaced_usernames(self.session, rows)
+        return upsert_rows(self.session, User, rows, [column for column in rows[0] if column != "id"])
+
     def add(self, user: User) -> None:
         self.session.add(user)
         self.session.commit()
@@ -56,6 +260,9 @@ class PostRepository:
 
     def save_or_update(self, post_data: PostData) -> Post:
         post = self.get_by_id(post_data.post_id)
+        fingerprint = post_row(post_data)["fingerprint"]
+        if post and post.fingerprint == fingerprint:
+            return post
         if not post:
             post = Post(id=post_data.post_id, author_id=post_data.author_id)
             self.session.add(post)
@@ -67,11 +274,384 @@ class PostRepository:
         post.responses_count = post_data.responses_count
         post.reading_time = post_data.reading_time
         post.collection_id = post_data.collection_id
+        post.fingerprint = fingerprint
 
         self.session.commit()
 
         return post
 
+    def bulk_upsert_posts(self, posts: List[PostData]) -> List[str]:
+        if not posts:
+            return []
+        # content is fetched separately and never overwritten by a listing refresh
+        rows = [post_row(post_data) for post_data in posts]
+        return upsert_rows(self.session, Post, rows, [column for column in rows[0] if column != "id"])
+
+    def get_ids_without_content(self, author_id: str) -> List[str]:
+        rows = self.session.query(Post.id).filter(Post.author_id == author_id, Post.content.is_(None)).all()
+        return [row.id for row in rows]
+
+    def get_existing_ids(self, post_ids: List[str]) -> set:
+        return {row.id for row in self.session.query(Post.id).filter(Post.id.in_(post_ids))}
+
+    def set_content(self, post_id: str, content: str) -> None:
+        self.session.query(Post).filter(Post.id == post_id).update({Post.content: content}, synchronize_session=False)
+        self.session.commit()
+
+    def bulk_set_content(self, contents: List[Tuple[str, str]]) -> None:
+        if not contents:
+            return
+        # executemany UPDATE keyed by primary key, one round trip per batch
+        self.session.execute(update(Post), content_rows(contents))
+        self.session.commit()
+
     def bulk_save(self, posts: List[Post]) -> None:
         self.session.bulk_save_objects(posts)
         self.session.commit()
+
+
+class TopicRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def count(self) -> int:
+        return self.session.query(func.count(Topic.id)).scalar()
+
+    def get_by_slug(self, slug: str) -> Optional[Topic]:
+        return self.session.query(Topic).filter(Topic.normalized_slug == slug).first()
+
+    def bulk_upsert_topics(self, rows: List[Dict[str, Any]]) -> List[str]:
+        if not rows:
+            return []
+        return upsert_rows(self.session, Topic, rows, [column for column in rows[0] if column != "id"])
+
+    def descendant_slugs(self, slug: str) -> List[str]:
+        """The topic's slug followed by every topic below it; unknown slugs return []."""
+        root = self.get_by_slug(slug)
+        if not root:
+            return []
+        rows = self.session.query(Topic.normalized_slug).filter(
+            Topic.path.startswith(root.path, autoescape=True)
+        ).order_by(Topic.path)
+        return [row.normalized_slug for row in rows]
+
+    def expand_slugs(self, slugs: List[str]) -> List[str]:
+        expanded: Dict[str, None] = {}
+        for slug in slugs:
+            expanded.update(dict.fromkeys(self.descendant_slugs(slug) or [slug]))
+        return list(expanded)
+
+    def store_members(self, topic: str, members: List[Tuple[str, str]], start_rank: int) -> int:
+        """
+        Records one discovery page of (user_id, username) for the topic: missing stub
+        users and the topic_users rows (rank, last_seen_at refreshed) in one statement
+        each. Returns how many of the users were not members of the topic before.
+        """
+        if not members:
+            return 0
+        stub_users, links = topic_member_rows(topic, members, start_rank)
+        existing = {
+            row.user_id for row in self.session.query(topic_users.c.user_id).filter(
+                topic_users.c.topic_slug == topic,
+                topic_users.c.user_id.in_([link["user_id"] for link in links])
+            )
+        }
+
+        insert_missing_rows(self.session, User.__table__, stub_users)
+        insert = _dialect_insert(self.session)
+        if insert is None:
+            insert_missing_rows(self.session, topic_users, links)
+        else:
+            for statement in upsert_link_statements(
+                    insert, topic_users, links, ["topic_slug", "user_id"], ["rank", "last_seen_at"]
+            ):
+                self.session.execute(statement)
+        self.session.commit()
+        return len(links) - len(existing)
+
+    def member_page(self, topic: str, after: Optional[Tuple[int, str]], limit: int) -> List[tuple]:
+        """Next (rank, user_id, username) rows of a topic in rank order, keyset-paged on (rank, user_id)."""
+        query = self.session.query(topic_users.c.rank, User.id, User.username).join(
+            User, User.id == topic_users.c.user_id
+        ).filter(topic_users.c.topic_slug == topic)
+        if after:
+            rank, user_id = after
+            query = query.filter(or_(
+                topic_users.c.rank > rank,
+                and_(topic_users.c.rank == rank, topic_users.c.user_id > user_id)
+            ))
+        return query.order_by(topic_users.c.rank, topic_users.c.user_id).limit(limit).all()
+
+
+class FollowRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def bulk_insert_followers(self, stub_users: List[Dict[str, Any]], edges: List[Tuple[str, str]]) -> None:
+        """
+        Inserts follower stub users (id, username, name, bio) that are not stored yet and
+        then the (follower_id, followed_id) edges, one statement each, in one transaction.
+        """
+        stub_users, edge_rows = follower_rows(stub_users, edges)
+        insert_missing_rows(self.session, User.__table__, stub_users)
+        insert_missing_rows(self.session, followers, edge_rows)
+        self.session.commit()
+
+
+class JobRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    @property
+    def _is_postgres(self) -> bool:
+        return self.session.get_bind().dialect.name == "postgresql"
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def enqueue(self, jobs: List[Tuple[str, str]]) -> int:
+        if not jobs:
+            return 0
+
+        existing = {
+            (row.username, row.phase)
+            for row in self.session.query(ScrapeJob.username, ScrapeJob.phase).filter(
+                ScrapeJob.username.in_({username for username, _ in jobs})
+            )
+        }
+        now = self._now()
+        new_jobs = [
+            ScrapeJob(username=username, phase=phase, status="pending", attempts=0, updated_at=now)
+            for username, phase in dict.fromkeys(jobs)
+            if (username, phase) not in existing
+        ]
+        try:
+            self.session.add_all(new_jobs)
+            self.session.commit()
+        except IntegrityError:
+            # Another process enqueued some of the same jobs in between; add them one by one
+            self.session.rollback()
+            added = 0
+            for job in new_jobs:
+                try:
+                    self.session.add(ScrapeJob(
+                        username=job.username, phase=job.phase, status="pending", attempts=0, updated_at=now
+                    ))
+                    self.session.commit()
+                    added += 1
+                except IntegrityError:
+                    self.session.rollback()
+            return added
+        return len(new_jobs)
+
+    def _claimable(self, now: datetime):
+        return or_(
+            ScrapeJob.status == "pending",
+            and_(ScrapeJob.status == "leased", ScrapeJob.lease_expires_at < now)
+        )
+
+    def claim(self, worker_id: str, limit: int, lease_seconds: int) -> List[ScrapeJob]:
+        now = self._now()
+        expires_at = now + timedelta(seconds=lease_seconds)
+        query = self.session.query(ScrapeJob).filter(self._claimable(now)).order_by(ScrapeJob.id).limit(limit)
+
+        if self._is_postgres:
+            jobs = query.with_for_update(skip_locked=True).all()
+            for job in jobs:
+                job.status = "leased"
+                job.lease_owner = worker_id
+                job.lease_expires_at = expires_at
+                job.attempts += 1
+                job.updated_at = now
+            self.session.commit()
+            return jobs
+
+        # No SKIP LOCKED (e.g. SQLite): claim each row with a conditional UPDATE and keep
+        # only the ones this worker actually won
+        claimed_ids = []
+        for job_id, in query.with_entities(ScrapeJob.id).all():
+            won = self.session.query(ScrapeJob).filter(ScrapeJob.id == job_id, self._claimable(now)).update({
+                ScrapeJob.status: "leased",
+                ScrapeJob.lease_owner: worker_id,
+                ScrapeJob.lease_expires_at: expires_at,
+                ScrapeJob.attempts: ScrapeJob.attempts + 1,
+                ScrapeJob.updated_at: now,
+            }, synchronize_session=False)
+            if won:
+                claimed_ids.append(job_id)
+        self.session.commit()
+        if not claimed_ids:
+            return []
+        return self.session.query(ScrapeJob).filter(ScrapeJob.id.in_(claimed_ids)).order_by(ScrapeJob.id).all()
+
+    def heartbeat(self, job_ids: List[int], worker_id: str, lease_seconds: int) -> int:
+        if not job_ids:
+            return 0
+        extended = self.session.query(ScrapeJob).filter(
+            ScrapeJob.id.in_(job_ids),
+            ScrapeJob.lease_owner == worker_id,
+            ScrapeJob.status == "leased"
+        ).update({
+            ScrapeJob.lease_expires_at: self._now() + timedelta(seconds=lease_seconds),
+        }, synchronize_session=False)
+        self.session.commit()
+        return extended
+
+    def _mark_done(self, job: ScrapeJob) -> None:
+        job.status = "done"
+        job.lease_owner = None
+        job.lease_expires_at = None
+        job.updated_at = self._now()
+
+    def complete(self, job: ScrapeJob, next_phase: Optional[str] = None) -> None:
+        # The next phase is added in the same transaction, so a crash can never leave a
+        # job done without its successor queued
+        self._mark_done(job)
+        if next_phase and not self.session.query(ScrapeJob.id).filter(
+            ScrapeJob.username == job.username, ScrapeJob.phase == next_phase
+        ).first():
+            self.session.add(ScrapeJob(
+                username=job.username, phase=next_phase, status="pending", attempts=0, updated_at=job.updated_at
+            ))
+        try:
+            self.session.commit()
+        except IntegrityError:
+            # Another process queued the next phase in between; it exists, so only mark this one done
+            self.session.rollback()
+            self._mark_done(job)
+            self.session.commit()
+
+    def fail(self, job: ScrapeJob, error: str, max_attempts: int) -> None:
+        job.status = "failed" if job.attempts >= max_attempts else "pending"
+        job.lease_owner = None
+        job.lease_expires_at = None
+        job.last_error = error
+        job.updated_at = self._now()
+        self.session.commit()
+
+    def has_open_jobs(self) -> bool:
+        return self.session.query(ScrapeJob.id).filter(ScrapeJob.status.in_(("pending", "leased"))).first() is not None
+
+    def finished(self, phases: List[str]) -> List[Tuple[str, str, Optional[datetime]]]:
+        return [
+            (row.username, row.phase, row.updated_at)
+            for row in self.session.query(ScrapeJob.username, ScrapeJob.phase, ScrapeJob.updated_at).filter(
+                ScrapeJob.status == "done", ScrapeJob.phase.in_(phases)
+            )
+        ]
+
+    def counts(self) -> dict:
+        rows = self.session.query(ScrapeJob.phase, ScrapeJob.status, func.count(ScrapeJob.id)).group_by(
+            ScrapeJob.phase, ScrapeJob.status
+        )
+        return {f"{phase}:{status}": count for phase, status, count in rows}
+
+
+class UserProgressRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def load(self, username: str) -> Optional[Dict[str, Any]]:
+        row = self.session.get(UserProgress, username)
+        return json.loads(row.state) if row else None
+
+    def save(self, username: str, snapshot: Dict[str, Any]) -> None:
+        row = UserProgress(
+            username=username,
+            state=json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")),
+            updated_at=datetime.now(timezone.utc)
+        )
+        try:
+            self.session.merge(row)
+            self.session.commit()
+        except IntegrityError:
+            # Another process saved the first state for this user in between; overwrite it
+            self.session.rollback()
+            self.session.merge(row)
+            self.session.commit()
+
+
+class RefreshRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def seed(self, entries: List[Tuple[str, str, Optional[datetime]]]) -> int:
+        """Starts tracking (username, phase, fetched_at) entries that are not tracked yet."""
+        entries = list({(username, phase): fetched_at for username, phase, fetched_at in entries}.items())
+        added = 0
+        for start in range(0, len(entries), UPSERT_CHUNK_SIZE):
+            chunk = entries[start:start + UPSERT_CHUNK_SIZE]
+            existing = {
+                (row.username, row.phase)
+                for row in self.session.query(UserRefresh.username, UserRefresh.phase).filter(
+                    UserRefresh.username.in_({username for (username, _), _ in chunk})
+                )
+            }
+            new_rows = [
+                UserRefresh(username=username, phase=phase, fetched_at=fetched_at, attempted_at=fetched_at,
+                            requests=0, refreshes=0)
+                for (username, phase), fetched_at in chunk
+                if (username, phase) not in existing
+            ]
+            try:
+                self.session.add_all(new_rows)
+                self.session.commit()
+                added += len(new_rows)
+            except IntegrityError:
+                # Another daemon seeded some of them in between; the rest of this chunk
+                # is picked up the next time a daemon starts
+                self.session.rollback()
+        return added
+
+    def stale(self, phases: List[str], attempted_before: datetime, active_since: datetime, limit: int):
+        """
+        Oldest tracked entries not attempted since attempted_before (never fetched
+        first), with the signals refresh priority is weighted by: the user's follower
+        count and their posts published since active_since.
+        """
+        recent_posts = self.session.query(
+            Post.author_id, func.count(Post.id).label("recent_posts")
+        ).filter(Post.published_at >= active_since).group_by(Post.author_id).subquery()
+
+        return self.session.query(
+            UserRefresh.username,
+            UserRefresh.phase,
+            UserRefresh.fetched_at,
+            UserRefresh.requests,
+            func.coalesce(User.followers_count, 0).label("followers_count"),
+            func.coalesce(recent_posts.c.recent_posts, 0).label("recent_posts"),
+        ).outerjoin(
+            User, User.username == UserRefresh.username
+        ).outerjoin(
+            recent_posts, recent_posts.c.author_id == User.id
+        ).filter(
+            UserRefresh.phase.in_(phases),
+            or_(UserRefresh.attempted_at.is_(None), UserRefresh.attempted_at < attempted_before)
+        ).order_by(UserRefresh.fetched_at.asc().nulls_first()).limit(limit).all()
+
+    def mark(self, username: str, phase: str, succeeded: bool, requests: Optional[int]) -> None:
+        """requests=None keeps the recorded cost, e.g. for a refresh that was skipped."""
+        now = self._now()
+        values = {UserRefresh.attempted_at: now}
+        if succeeded:
+            values.update({
+                UserRefresh.fetched_at: now,
+                UserRefresh.refreshes: UserRefresh.refreshes + 1,
+            })
+            if requests is not None:
+                values[UserRefresh.requests] = requests
+        self.session.query(UserRefresh).filter(
+            UserRefresh.username == username, UserRefresh.phase == phase
+        ).update(values, synchronize_session=False)
+        self.session.commit()
+
+    def counts(self) -> dict:
+        rows = self.session.query(
+            UserRefresh.phase, func.count(UserRefresh.username), func.sum(UserRefresh.refreshes)
+        ).group_by(UserRefresh.phase)
+        return {phase: {"tracked": tracked, "refreshes": refreshes or 0} for phase, tracked, refreshes in rows}
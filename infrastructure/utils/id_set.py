@@ -0,0 +1,40 @@
+from typing import Iterable, Set, Union
+
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+
+class CompactIdSet:
+    """
+    Set of Medium ids (12-hex-digit strings such as "a1b2c3d4e5f6") kept as ints,
+    which takes roughly half the memory of the strings themselves. Ids that are not
+    hex fall back to a plain string set.
+    """
+
+    def __init__(self, ids: Iterable[str] = ()):
+        self._ints: Set[int] = set()
+        self._others: Set[str] = set()
+        for id_ in ids:
+            self.add(id_)
+
+    @staticmethod
+    def _key(id_: str) -> Union[int, str]:
+        # Only canonical lowercase hex is packed; "0ab" and "AB" would collide with "ab"
+        if id_ and id_[0] != "0" and len(id_) <= 16 and _HEX_DIGITS.issuperset(id_):
+            return int(id_, 16)
+        return id_
+
+    def add(self, id_: str) -> bool:
+        """Adds the id and returns True if it was not seen before."""
+        key = self._key(id_)
+        target = self._ints if isinstance(key, int) else self._others
+        if key in target:
+            return False
+        target.add(key)
+        return True
+
+    def __contains__(self, id_: str) -> bool:
+        key = self._key(id_)
+        return key in (self._ints if isinstance(key, int) else self._others)
+
+    def __len__(self) -> int:
+        return len(self._ints) + len(self._others)
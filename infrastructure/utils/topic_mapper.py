@@ -0,0 +1,33 @@
+from typing import Any, Dict, List, Union
+
+
+def extract_topic_rows(data: Union[list, dict]) -> List[Dict[str, Any]]:
+    """
+    Flattens an ExploreTopicsQuery response (the format saved in topics.json) into
+    Topic rows in one pass, parents before children, each with its materialized path
+    of ids.
+    """
+    if isinstance(data, list):
+        data = data[0]
+    root_tags = data["data"]["rootTags"]
+
+    rows = []
+    stack = [(tag, None, "/", 0) for tag in reversed(root_tags)]
+    while stack:
+        tag, parent_id, parent_path, depth = stack.pop()
+        path = f"{parent_path}{tag['id']}/"
+        rows.append({
+            "id": tag["id"],
+            "display_title": tag["displayTitle"],
+            "normalized_slug": tag.get("normalizedTagSlug") or tag["id"],
+            "parent_id": parent_id,
+            "path": path,
+            "depth": depth,
+        })
+        for child in reversed(tag.get("childTags") or []):
+            stack.append((child, tag["id"], path, depth + 1))
+    return rows
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,160 @@
+import asyncio
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from core.entities import UserData, PostData
+from infrastructure.repository import UserRepository, PostRepository, FollowRepository
+
+# Within one batch, rows are written in this order so foreign keys always resolve
+KIND_ORDER = ("users", "posts", "post_content", "followers")
+
+_STOP = object()
+
+
+class WriteBehindWriter:
+    """
+    Moves DB writes off the event loop. Scraper coroutines enqueue rows and await an
+    acknowledgement; a dedicated thread with its own Session drains the queue in
+    group-commit batches: everything that queued up while the previous batch was
+    being written, bounded by `max_batch` items or `max_delay` seconds of draining,
+    and never waiting for more once the queue is empty. Each acknowledgement is
+    resolved once the batch holding its rows is committed (or failed).
+    Callers only checkpoint progress after the ack, so progress never runs ahead
+    of what is durable in the database. User and post acks carry the ids of the
+    caller's rows that were actually inserted or changed.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_batch: int = 500, max_delay: float = 0.2):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.items = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    async def _submit(self, kind: str, payload: Any) -> Any:
+        self.start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((kind, payload, future, loop))
+        return await future
+
+    async def put_users(self, users: List[UserData], about_texts: Optional[Dict[str, str]] = None) -> List[str]:
+        return await self._submit("users", (users, about_texts or {}))
+
+    async def put_posts(self, posts: List[PostData]) -> List[str]:
+        return await self._submit("posts", posts)
+
+    async def put_post_content(self, post_id: str, content: str) -> None:
+        await self._submit("post_content", (post_id, content))
+
+    async def put_followers(self, stub_users: List[Dict[str, Any]], edges: List[Tuple[str, str]]) -> None:
+        await self._submit("followers", (stub_users, edges))
+
+    async def close(self) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        await asyncio.get_running_loop().run_in_executor(None, self._thread.join)
+        self._thread = None
+
+    def _run(self) -> None:
+        session = self.session_factory()
+        try:
+            stopping = False
+            while not stopping:
+                batch = []
+                item = self._queue.get()
+                deadline = time.monotonic() + self.max_delay
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                    else:
+                        batch.append(item)
+                    if stopping or len(batch) >= self.max_batch or time.monotonic() >= deadline:
+                        break
+                    # Group commit: take whatever queued up while the last batch was being
+                    # written and flush as soon as the queue is empty, never waiting for more
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if batch:
+                    self._write(session, batch)
+        finally:
+            session.close()
+
+    def _write(self, session: Session, batch: List[tuple]) -> None:
+        grouped: Dict[str, List[tuple]] = {kind: [] for kind in KIND_ORDER}
+        for item in batch:
+            grouped[item[0]].append(item)
+
+        for kind in KIND_ORDER:
+            items = grouped[kind]
+            if not items:
+                continue
+            try:
+                outcomes = [(None, result) for result in self._write_kind(session, kind, items)]
+            except Exception as e:
+                session.rollback()
+                if len(items) == 1:
+                    outcomes = [(e, None)]
+                else:
+                    # Retry each caller's rows on their own so only the bad payload fails
+                    outcomes = [self._write_one(session, kind, item) for item in items]
+
+            for (_, _, future, loop), (error, result) in zip(items, outcomes):
+                loop.call_soon_threadsafe(self._resolve, future, error, result)
+
+        session.expunge_all()
+        self.batches += 1
+        self.items += len(batch)
+
+    def _write_one(self, session: Session, kind: str, item: tuple) -> Tuple[Optional[Exception], Any]:
+        try:
+            return None, self._write_kind(session, kind, [item])[0]
+        except Exception as e:
+            session.rollback()
+            return e, None
+
+    @staticmethod
+    def _write_kind(session: Session, kind: str, items: List[tuple]) -> List[Any]:
+        """Writes and commits one kind's items together; returns each item's ack result."""
+        if kind == "users":
+            about_texts = {}
+            rows = []
+            for _, (user_rows, texts), _, _ in items:
+                rows.extend(user_rows)
+                about_texts.update(texts)
+            changed = set(UserRepository(session).bulk_upsert_users(rows, about_texts))
+            return [[user.user_id for user in user_rows if user.user_id in changed] for _, (user_rows, _), _, _ in items]
+        if kind == "posts":
+            changed = set(PostRepository(session).bulk_upsert_posts([post for _, payload, _, _ in items for post in payload]))
+            return [[post.post_id for post in payload if post.post_id in changed] for _, payload, _, _ in items]
+        if kind == "post_content":
+            PostRepository(session).bulk_set_content([payload for _, payload, _, _ in items])
+        elif kind == "followers":
+            FollowRepository(session).bulk_insert_followers(
+                [row for _, (stub_users, _), _, _ in items for row in stub_users],
+                [edge for _, (_, edges), _, _ in items for edge in edges]
+            )
+        return [None] * len(items)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, error: Optional[Exception], result: Any = None) -> None:
+        if future.done():
+            return
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
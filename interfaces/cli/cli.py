@@ -1,14 +1,20 @@
 # interfaces/cli/cli.py
 import argparse
-import os
-from typing import List
+import asyncio
+from typing import List, Optional, Dict
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from application.job_worker import JobWorker
+from application.refresh_daemon import RefreshDaemon
 from application.scraper_service import ScraperService
 from config import settings
+from config.config import parse_stage_workers
 from infrastructure.db.base import Base
+from infrastructure.progress_store import ProgressStore
+from infrastructure.repository import JobRepository, RefreshRepository, UserProgressRepository
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -39,41 +45,227 @@ def create_parser() -> argparse.ArgumentParser:
         help="Target number of unique users"
     )
 
+    parser.add_argument(
+        "--expand-topics",
+        action="store_true",
+        help="Treat each --topics slug as a root and scrape its whole subtree from the topic taxonomy"
+    )
+
+    parser.add_argument(
+        "--refresh-topics",
+        action="store_true",
+        help="Re-download the topic taxonomy (ExploreTopicsQuery) into topics.json and the topics table"
+    )
+
+    parser.add_argument(
+        "--discovery",
+        nargs="+",
+        choices=["publishers", "feed", "members"],
+        default=settings.DISCOVERY_SOURCES,
+        help="Where new users come from: topic 'who to follow' publishers, authors in the topic post feeds, "
+             "and/or topic members already stored in topic_users (no API calls)"
+    )
+
+    parser.add_argument(
+        "--select",
+        choices=["stream", "best"],
+        default=settings.SELECTION_MODE,
+        help="How discovered users are picked: 'stream' takes them in discovery order, 'best' keeps the "
+             "highest scoring --target-users candidates (SELECTION_WEIGHTS) and stops discovery once saturated"
+    )
+
+    parser.add_argument(
+        "--recrawl-topics",
+        action="store_true",
+        help="Before collecting, walk the topics' member lists again from the top (even once --target-users is reached), "
+             "stopping each at the first page with no new members"
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.SCRAPE_CONCURRENCY,
+        help="Number of users scraped concurrently"
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        default=settings.PIPELINE_ENABLED,
+        help="Run the scrape phases as a staged pipeline with per-stage workers and bounded queues"
+    )
+
+    parser.add_argument(
+        "--stage-workers",
+        nargs="+",
+        default=None,
+        metavar="STAGE=N",
+        help="Workers per pipeline stage, e.g. details=2 posts=2 full_content=8 followers=2"
+    )
+
+    parser.add_argument(
+        "--write-behind",
+        action="store_true",
+        default=settings.WRITE_BEHIND_ENABLED,
+        help="Batch user/post writes on a background writer thread instead of the event loop"
+    )
+
+    parser.add_argument(
+        "--async-db",
+        action="store_true",
+        default=settings.ASYNC_DB_ENABLED,
+        help="Run scrape-phase queries on an async engine (asyncpg / aiosqlite) so they overlap with HTTP requests"
+    )
+
     parser.add_argument(
         "--reset",
         action="store_true",
         help="Start from scratch (delete previous progress)"
     )
 
+    parser.add_argument(
+        "--cache-dir",
+        default=settings.RESPONSE_CACHE_DIR,
+        help="Directory for the on-disk GraphQL response cache (disabled when not set)"
+    )
+
+    parser.add_argument(
+        "--api-base-url",
+        default=settings.MEDIUM_BASE_URL,
+        help="Override the Medium base URL, e.g. a local fake server (python -m infrastructure.api.fake_server)"
+    )
+
+    parser.add_argument(
+        "--record",
+        default=None,
+        help="Append every API response to this JSONL recording"
+    )
+
+    parser.add_argument(
+        "--replay",
+        default=None,
+        help="Answer API calls from a JSONL recording instead of the network"
+    )
+
+    parser.add_argument(
+        "--wait",
+        action="store_true",
+        help="Worker/refresh mode: keep polling for new jobs or stale users instead of exiting when none are left"
+    )
+
     parser.add_argument(
         "--mode",
-        choices=["scrape", "api"],
+        choices=["scrape", "enqueue", "worker", "refresh", "api"],
         default="scrape",
-        help="Execution mode: scrape or api (coming soon)"
+        help="Execution mode: scrape (single process), enqueue (discover users into the job table), "
+             "worker (claim and run jobs from the job table), refresh (re-fetch the stalest scraped users "
+             "within REFRESH_REQUESTS_PER_HOUR) or api (coming soon)"
     )
 
     return parser
 
 
-def run_scraper(topics: List[str], target_users: int, reset: bool):
-    if reset and os.path.exists(settings.PROGRESS_FILE):
+def create_session_factory() -> sessionmaker:
+    engine = create_engine(settings.DATABASE_URL)
+    Base.metadata.create_all(bind=engine)
+
+    return sessionmaker(bind=engine)
+
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def create_async_db_engine() -> AsyncEngine:
+    url = make_url(settings.ASYNC_DATABASE_URL or settings.DATABASE_URL)
+    url = url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+    return create_async_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True
+    )
+
+
+def topic_options(args: argparse.Namespace) -> Dict[str, bool]:
+    return {
+        "expand_topics": args.expand_topics,
+        "refresh_topics": args.refresh_topics,
+        "recrawl_topics": args.recrawl_topics,
+    }
+
+
+def scraper_options(args: argparse.Namespace) -> Dict[str, Optional[str]]:
+    return {
+        "cache_dir": args.cache_dir,
+        "api_base_url": args.api_base_url,
+        "record_path": args.record,
+        "replay_path": args.replay,
+    }
+
+
+def resolve_stage_workers(args: argparse.Namespace) -> Optional[Dict[str, int]]:
+    if not args.pipeline and not args.stage_workers:
+        return None
+
+    stage_workers = dict(settings.PIPELINE_STAGE_WORKERS)
+    if args.stage_workers:
+        stage_workers.update(parse_stage_workers(" ".join(args.stage_workers)))
+    return stage_workers
+
+
+def run_scraper(
+        topics: List[str],
+        target_users: int,
+        reset: bool,
+        cache_dir: Optional[str] = None,
+        api_base_url: Optional[str] = None,
+        record_path: Optional[str] = None,
+        replay_path: Optional[str] = None,
+        concurrency: int = 1,
+        stage_workers: Optional[Dict[str, int]] = None,
+        write_behind: bool = False,
+        async_db: bool = False,
+        discovery: Optional[List[str]] = None,
+        selection: Optional[str] = None,
+        expand_topics: bool = False,
+        refresh_topics: bool = False,
+        recrawl_topics: bool = False
+):
+    if reset:
         print("Deleting previous progress...")
-        os.remove(settings.PROGRESS_FILE)
+        ProgressStore.reset(settings.PROGRESS_FILE)
 
     print(f"Starting automated scrape — target: {target_users} users")
     print(f"Topics: {', '.join(topics)}")
 
-    engine = create_engine(settings.DATABASE_URL)
-    Base.metadata.create_all(bind=engine)
-
-    SessionLocal = sessionmaker(bind=engine)
+    SessionLocal = create_session_factory()
     session = SessionLocal()
 
-    scraper = ScraperService(session)
+    scraper = ScraperService(
+        session,
+        cache_dir=cache_dir,
+        api_base_url=api_base_url,
+        record_path=record_path,
+        replay_path=replay_path,
+        session_factory=SessionLocal if write_behind else None,
+        async_engine=create_async_db_engine() if async_db else None
+    )
     scraper.target_users = target_users
+    scraper.discovery_sources = discovery or scraper.discovery_sources
+    scraper.selection_mode = selection or scraper.selection_mode
+    scraper.expand_topic_subtrees = expand_topics
+    scraper.refresh_topics = refresh_topics
+    scraper.topic_recrawl = recrawl_topics
+    scraper.concurrency = concurrency
+    scraper.stage_workers = stage_workers
 
     try:
-        import asyncio
         asyncio.run(scraper.all_in_one(topics))
     except KeyboardInterrupt:
         print("\nScrape stopped — progress has been saved.")
@@ -82,12 +274,131 @@ def run_scraper(topics: List[str], target_users: int, reset: bool):
         print("Done! Progress file:", settings.PROGRESS_FILE)
 
 
+def run_enqueue(
+        topics: List[str],
+        target_users: int,
+        reset: bool,
+        discovery: Optional[List[str]] = None,
+        selection: Optional[str] = None,
+        expand_topics: bool = False,
+        refresh_topics: bool = False,
+        recrawl_topics: bool = False,
+        write_behind: bool = False,
+        async_db: bool = False,
+        **options
+):
+    if reset:
+        print("Deleting previous progress...")
+        ProgressStore.reset(settings.PROGRESS_FILE)
+
+    print(f"Discovering up to {target_users} users into the job table")
+    SessionLocal = create_session_factory()
+    session = SessionLocal()
+    scraper = ScraperService(
+        session,
+        session_factory=SessionLocal if write_behind else None,
+        async_engine=create_async_db_engine() if async_db else None,
+        **options
+    )
+    scraper.target_users = target_users
+    scraper.discovery_sources = discovery or scraper.discovery_sources
+    scraper.selection_mode = selection or scraper.selection_mode
+    scraper.expand_topic_subtrees = expand_topics
+    scraper.refresh_topics = refresh_topics
+    scraper.topic_recrawl = recrawl_topics
+
+    try:
+        asyncio.run(scraper.enqueue_jobs(topics, JobRepository(session)))
+    except KeyboardInterrupt:
+        print("\nEnqueue stopped — jobs enqueued so far are kept.")
+    finally:
+        session.close()
+
+
+def run_worker(concurrency: int, wait: bool, write_behind: bool = False, async_db: bool = False, **options):
+    SessionLocal = create_session_factory()
+    session = SessionLocal()
+    scraper = ScraperService(
+        session,
+        session_factory=SessionLocal if write_behind else None,
+        async_engine=create_async_db_engine() if async_db else None,
+        **options
+    )
+    scraper.concurrency = concurrency
+    worker = JobWorker(scraper, JobRepository(session), UserProgressRepository(session))
+
+    try:
+        asyncio.run(worker.run(wait=wait))
+    except KeyboardInterrupt:
+        print("\nWorker stopped — its leased jobs will be re-leased once their leases expire.")
+    finally:
+        session.close()
+
+
+def run_refresh(wait: bool, write_behind: bool = False, async_db: bool = False, **options):
+    SessionLocal = create_session_factory()
+    session = SessionLocal()
+    scraper = ScraperService(
+        session,
+        session_factory=SessionLocal if write_behind else None,
+        async_engine=create_async_db_engine() if async_db else None,
+        **options
+    )
+    daemon = RefreshDaemon(scraper, RefreshRepository(session), JobRepository(session), UserProgressRepository(session))
+
+    try:
+        asyncio.run(daemon.run(wait=wait))
+    except KeyboardInterrupt:
+        print("\nRefresh stopped — users refreshed so far are recorded.")
+    finally:
+        session.close()
+
+
 if __name__ == "__main__":
     parser = create_parser()
     args = parser.parse_args()
 
     if args.mode == "scrape":
-        run_scraper(args.topics, args.target_users, args.reset)
+        run_scraper(
+            args.topics,
+            args.target_users,
+            args.reset,
+            concurrency=args.concurrency,
+            stage_workers=resolve_stage_workers(args),
+            write_behind=args.write_behind,
+            async_db=args.async_db,
+            discovery=args.discovery,
+            selection=args.select,
+            **topic_options(args),
+            **scraper_options(args)
+        )
+    elif args.mode == "enqueue":
+        run_enqueue(
+            args.topics,
+            args.target_users,
+            args.reset,
+            write_behind=args.write_behind,
+            async_db=args.async_db,
+            discovery=args.discovery,
+            selection=args.select,
+            **topic_options(args),
+            **scraper_options(args)
+        )
+    elif args.mode == "worker":
+        run_worker(
+            args.concurrency,
+            args.wait,
+            write_behind=args.write_behind,
+            async_db=args.async_db,
+            **scraper_options(args)
+        )
+    elif args.mode == "refresh":
+        run_refresh(
+            args.wait,
+            write_behind=args.write_behind,
+            async_db=args.async_db,
+            **scraper_options(args)
+        )
     elif args.mode == "api":
         print("Launching FastAPI... (coming soon!)")
         # uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -6,11 +6,27 @@ CLI execution:
     python main.py --topics startups python --target-users 200
     python main.py --reset
 
+Distributed execution (any number of workers, on any machine sharing DATABASE_URL):
+    python main.py --mode enqueue --topics startup --target-users 5000
+    python main.py --mode worker --concurrency 8
+
+Keeping scraped users current (stalest and most active first, within a request budget):
+    python main.py --mode refresh --wait
+
 FastAPI execution (in the future):
     python main.py --mode api
 """
 
-from interfaces.cli.cli import create_parser, run_scraper
+from interfaces.cli.cli import (
+    create_parser,
+    run_scraper,
+    run_enqueue,
+    run_worker,
+    run_refresh,
+    resolve_stage_workers,
+    scraper_options,
+    topic_options
+)
 import sys
 
 
@@ -20,7 +36,46 @@ if __name__ == "__main__":
     topics = args.topics
 
     if args.mode == "scrape":
-        run_scraper(args.topics, args.target_users, args.reset)
+        run_scraper(
+            args.topics,
+            args.target_users,
+            args.reset,
+            concurrency=args.concurrency,
+            stage_workers=resolve_stage_workers(args),
+            write_behind=args.write_behind,
+            async_db=args.async_db,
+            discovery=args.discovery,
+            selection=args.select,
+            **topic_options(args),
+            **scraper_options(args)
+        )
+    elif args.mode == "enqueue":
+        run_enqueue(
+            args.topics,
+            args.target_users,
+            args.reset,
+            write_behind=args.write_behind,
+            async_db=args.async_db,
+            discovery=args.discovery,
+            selection=args.select,
+            **topic_options(args),
+            **scraper_options(args)
+        )
+    elif args.mode == "worker":
+        run_worker(
+            args.concurrency,
+            args.wait,
+            write_behind=args.write_behind,
+            async_db=args.async_db,
+            **scraper_options(args)
+        )
+    elif args.mode == "refresh":
+        run_refresh(
+            args.wait,
+            write_behind=args.write_behind,
+            async_db=args.async_db,
+            **scraper_options(args)
+        )
     elif args.mode == "api":
         print("FastAPI not yet implemented — coming soon!")
         sys.exit(0)
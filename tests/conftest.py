@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from infrastructure.api.fake_server import FakeMediumServer
+from infrastructure.api.rate_limiter import AdaptiveRateLimiter
+from infrastructure.api.transport import TransportResponse
+from infrastructure.db.base import Base
+import infrastructure.repository  # noqa: F401  (registers every model on Base.metadata)
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(element, compiler, **kw):
+    return "JSON"
+
+
+class FakeServerTransport:
+    """Answers GraphQL bodies straight from FakeMediumServer.synthesize, without a socket."""
+
+    def __init__(self, server: FakeMediumServer):
+        self.server = server
+        self.requests = 0
+
+    async def post(self, url, body, headers, proxy, impersonate):
+        self.requests += 1
+        return TransportResponse(200, json.dumps([
+            self.server.synthesize(operation["operationName"], operation.get("variables") or {})
+            for operation in body
+        ]).encode())
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def session(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def fake_server():
+    return FakeMediumServer(users_per_topic=40, posts_per_user=12, followers_per_user=30)
+
+
+@pytest.fixture
+def scraper(session, fake_server, tmp_path):
+    from application.scraper_service import ScraperService
+
+    scraper = ScraperService(session)
+    scraper.progress_file = str(tmp_path / "progress.json")
+    scraper.api.transport = FakeServerTransport(fake_server)
+    scraper.api.rate_limiter = AdaptiveRateLimiter(initial_rate=10000, max_rate=10000)
+    return scraper
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from infrastructure.api.batcher import GraphQLBatcher, batch_key
+from infrastructure.api.medium_api import MediumApi
+from infrastructure.api.rate_limiter import AdaptiveRateLimiter
+from tests.conftest import FakeServerTransport
+
+
+class RecordingTransport(FakeServerTransport):
+    def __init__(self, server):
+        super().__init__(server)
+        self.bodies = []
+
+    async def post(self, url, body, headers, proxy, impersonate):
+        self.bodies.append([operation["operationName"] for operation in body])
+        return await super().post(url, body, headers, proxy, impersonate)
+
+
+def test_operations_are_batched_per_operation_and_answered_in_order(fake_server):
+    transport = RecordingTransport(fake_server)
+    api = MediumApi(
+        transport=transport,
+        batch_size=4,
+        batch_window=0.01,
+        rate_limiter=AdaptiveRateLimiter(initial_rate=10000, max_rate=10000)
+    )
+    usernames = [f"user{i}" for i in range(6)]
+    post_ids = ["p1", "p2"]
+
+    async def fetch():
+        results = await asyncio.gather(
+            *(api.get_user_data(username) for username in usernames),
+            *(api.get_full_post_content(post_id) for post_id in post_ids),
+            # Paged queries are never batched
+            api.get_user_posts("user0")
+        )
+        await api.aclose()
+        return results
+
+    results = asyncio.run(fetch())
+    assert [r[0]["data"]["userResult"]["username"] for r in results[:6]] == usernames
+    assert [r[0]["data"]["post"]["id"] for r in results[6:8]] == post_ids
+    assert sorted(transport.bodies) == sorted([
+        ["UserAboutQuery"] * 4, ["UserAboutQuery"] * 2, ["FullPostQuery"] * 2, ["UserProfileQuery"]
+    ])
+    assert api.requests_sent == 4
+
+
+def test_per_request_headers_do_not_split_batches():
+    operation = {"operationName": "UserAboutQuery"}
+    assert batch_key(operation, {"x-client-date": "1", "apollo-client": "web"}) == \
+        batch_key(operation, {"x-client-date": "2", "apollo-client": "web"})
+    assert batch_key(operation, {"apollo-client": "web"}) != batch_key(operation, {"apollo-client": "ios"})
+
+
+def test_a_failed_batch_fails_every_caller_in_it():
+    sent = []
+
+    async def send(body, headers):
+        sent.append(len(body))
+        raise ConnectionError("reset")
+
+    async def submit_all():
+        batcher = GraphQLBatcher(send, max_batch_size=3, max_wait=0.01)
+        results = await asyncio.gather(
+            *(batcher.submit({"operationName": "UserAboutQuery", "variables": {"username": str(i)}}) for i in range(3)),
+            return_exceptions=True
+        )
+        await batcher.aclose()
+        return results
+
+    results = asyncio.run(submit_all())
+    assert sent == [3]
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+def test_short_responses_are_rejected():
+    async def send(body, headers):
+        return [{"data": {}}]
+
+    async def submit_two():
+        batcher = GraphQLBatcher(send, max_batch_size=2, max_wait=0.01)
+        await asyncio.gather(*(batcher.submit({"operationName": "FullPostQuery"}) for _ in range(2)))
+
+    with pytest.raises(ValueError, match="for 2 operations"):
+        asyncio.run(submit_two())
@@ -0,0 +1,31 @@
+import asyncio
+import json
+
+from infrastructure.api.fake_server import FakeMediumServer
+
+
+def test_stop_closes_open_connections_without_loop_errors():
+    errors = []
+
+    async def run():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        server = FakeMediumServer(port=0, users_per_topic=5)
+        await server.start()
+        port = server._server.sockets[0].getsockname()[1]
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        body = json.dumps([{"operationName": "WhoToFollowFeedQuery", "variables": {"tagSlug": "programming"}}])
+        writer.write(f"POST /_/graphql HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n{body}".encode())
+        await writer.drain()
+        assert (await reader.readline()).startswith(b"HTTP/1.1 200")
+        idle = [await asyncio.open_connection("127.0.0.1", port) for _ in range(3)]
+        await asyncio.sleep(0.01)
+
+        await server.stop()
+        assert not server._connections
+        for _, idle_writer in idle + [(reader, writer)]:
+            idle_writer.close()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert errors == []
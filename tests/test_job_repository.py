@@ -0,0 +1,149 @@
+import asyncio
+
+from application.job_worker import JobWorker
+from infrastructure.db.models.job import ScrapeJob
+from infrastructure.db.models.post import Post
+from infrastructure.progress_store import ProgressStore
+from infrastructure.repository import JobRepository, UserProgressRepository
+
+
+def test_enqueue_skips_existing_jobs(session):
+    jobs = JobRepository(session)
+    assert jobs.enqueue([("alice", "details"), ("bob", "details"), ("alice", "details")]) == 2
+    assert jobs.enqueue([("alice", "details"), ("carol", "details")]) == 1
+    assert session.query(ScrapeJob).count() == 3
+
+
+def test_claim_without_skip_locked_never_hands_out_a_job_twice(session_factory):
+    first, second = session_factory(), session_factory()
+    JobRepository(first).enqueue([(f"user{i}", "details") for i in range(5)])
+
+    claimed_a = JobRepository(first).claim("worker-a", limit=3, lease_seconds=60)
+    claimed_b = JobRepository(second).claim("worker-b", limit=10, lease_seconds=60)
+
+    assert [job.username for job in claimed_a] == ["user0", "user1", "user2"]
+    assert [job.username for job in claimed_b] == ["user3", "user4"]
+    assert all(job.status == "leased" and job.attempts == 1 for job in claimed_a + claimed_b)
+    assert JobRepository(second).claim("worker-b", limit=10, lease_seconds=60) == []
+    first.close()
+    second.close()
+
+
+def test_expired_lease_is_claimed_again(session):
+    jobs = JobRepository(session)
+    jobs.enqueue([("alice", "details")])
+    assert len(jobs.claim("worker-a", limit=1, lease_seconds=-1)) == 1
+
+    reclaimed = jobs.claim("worker-b", limit=1, lease_seconds=60)
+    assert [(job.username, job.lease_owner, job.attempts) for job in reclaimed] == [("alice", "worker-b", 2)]
+
+
+def test_complete_queues_next_phase_in_the_same_commit(session_factory):
+    session = session_factory()
+    jobs = JobRepository(session)
+    jobs.enqueue([("alice", "details")])
+    job, = jobs.claim("worker-a", limit=1, lease_seconds=60)
+    jobs.complete(job, "posts")
+
+    other = session_factory()
+    rows = {(row.phase, row.status) for row in other.query(ScrapeJob).filter(ScrapeJob.username == "alice")}
+    assert rows == {("details", "done"), ("posts", "pending")}
+
+    # A successor queued by someone else is not duplicated
+    job, = jobs.claim("worker-a", limit=1, lease_seconds=60)
+    JobRepository(other).enqueue([("alice", "full_content")])
+    jobs.complete(job, "full_content")
+    assert session.query(ScrapeJob).filter(ScrapeJob.username == "alice").count() == 3
+    session.close()
+    other.close()
+
+
+def test_fail_retries_until_max_attempts(session):
+    jobs = JobRepository(session)
+    jobs.enqueue([("alice", "details")])
+
+    job, = jobs.claim("worker-a", limit=1, lease_seconds=60)
+    jobs.fail(job, "boom", max_attempts=2)
+    assert (job.status, job.last_error) == ("pending", "boom")
+
+    job, = jobs.claim("worker-a", limit=1, lease_seconds=60)
+    jobs.fail(job, "boom again", max_attempts=2)
+    assert job.status == "failed"
+    assert not jobs.has_open_jobs()
+
+
+def test_worker_drains_every_phase_against_the_fake_server(scraper, session, fake_server):
+    usernames = fake_server._topic_usernames("programming")[:3]
+    jobs = JobRepository(session)
+    jobs.enqueue([(username, "details") for username in usernames])
+
+    worker = JobWorker(scraper, jobs)
+    asyncio.run(worker.run())
+
+    assert (worker.completed, worker.failed) == (12, 0)
+    assert jobs.counts() == {f"{phase}:done": 3 for phase in ("details", "posts", "full_content", "followers")}
+
+
+def test_failed_posts_job_resumes_from_its_saved_cursor(scraper, session, fake_server, monkeypatch):
+    username = fake_server._topic_usernames("programming")[0]
+    asyncio.run(scraper.scrape_user_details(username, ProgressStore(None)))
+    scraper.posts_max_pages = 0
+    jobs = JobRepository(session)
+    jobs.enqueue([(username, "posts")])
+    worker = JobWorker(scraper, jobs)
+
+    fetch_page = scraper._fetch_user_posts_page
+    requested, broken = [], [True]
+
+    async def second_page_fails(name, from_cursor=None):
+        requested.append(from_cursor)
+        if from_cursor and broken:
+            raise RuntimeError("connection reset")
+        return await fetch_page(name, from_cursor)
+
+    monkeypatch.setattr(scraper, "_fetch_user_posts_page", second_page_fails)
+    job, = jobs.claim("worker-a", limit=1, lease_seconds=60)
+    asyncio.run(worker._run_job(job))
+    assert job.status == "pending"
+    state = UserProgressRepository(session).load(username)
+    assert state["values"][f"cursor:posts:{username}"] == {"from": "10", "pages": 1, "saved": 10}
+
+    requested.clear()
+    broken.clear()
+    job, = jobs.claim("worker-b", limit=1, lease_seconds=60)
+    asyncio.run(worker._run_job(job))
+    assert requested == ["10"]
+    assert job.status == "done"
+    assert session.query(Post).count() == 12
+    assert jobs.counts() == {"posts:done": 1, "full_content:pending": 1}
+
+
+def test_full_content_job_retries_posts_that_failed(scraper, session, fake_server, monkeypatch):
+    username = fake_server._topic_usernames("programming")[0]
+    progress = ProgressStore(None)
+    asyncio.run(scraper.scrape_user_details(username, progress))
+    asyncio.run(scraper.scrape_user_posts(username, progress))
+    jobs = JobRepository(session)
+    jobs.enqueue([(username, "full_content")])
+    worker = JobWorker(scraper, jobs)
+
+    fetch_content = scraper._fetch_full_post_content
+    broken = {session.query(Post.id).order_by(Post.id).first()[0]}
+
+    async def flaky_fetch(post_id):
+        if post_id in broken:
+            raise RuntimeError("timeout")
+        return await fetch_content(post_id)
+
+    monkeypatch.setattr(scraper, "_fetch_full_post_content", flaky_fetch)
+    job, = jobs.claim("worker-a", limit=1, lease_seconds=60)
+    asyncio.run(worker._run_job(job))
+    assert (job.status, job.last_error) == ("pending", "1 posts without full content")
+    assert UserProgressRepository(session).load(username)["failed_full_content_posts"] == list(broken)
+
+    broken.clear()
+    job, = jobs.claim("worker-a", limit=1, lease_seconds=60)
+    asyncio.run(worker._run_job(job))
+    assert job.status == "done"
+    assert UserProgressRepository(session).load(username)["failed_full_content_posts"] == []
+    assert session.query(Post).filter(Post.content.is_(None)).count() == 0
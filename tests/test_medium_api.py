@@ -0,0 +1,27 @@
+import asyncio
+
+from infrastructure.api.medium_api import MediumApi
+from infrastructure.api.rate_limiter import AdaptiveRateLimiter
+from infrastructure.api.response_cache import ResponseCache
+from tests.conftest import FakeServerTransport
+
+
+def test_read_cache_off_refetches_but_keeps_the_cache_warm(fake_server, tmp_path):
+    transport = FakeServerTransport(fake_server)
+    api = MediumApi(
+        transport=transport,
+        cache=ResponseCache(str(tmp_path / "cache")),
+        rate_limiter=AdaptiveRateLimiter(initial_rate=10000, max_rate=10000)
+    )
+
+    async def fetch():
+        await api.get_user_data("alice")
+        await api.get_user_data("alice")
+        api.read_cache = False
+        await api.get_user_data("alice")
+        api.read_cache = True
+        await api.get_user_data("alice")
+        await api.aclose()
+
+    asyncio.run(fetch())
+    assert transport.requests == 2
@@ -0,0 +1,99 @@
+import asyncio
+
+from application.pipeline import Stage, StagedPipeline, merge_streams
+from infrastructure.progress_store import ProgressStore
+
+
+def test_merge_streams_never_advances_a_source_past_unconsumed_items():
+    resumed = []
+
+    async def source(name):
+        for index in range(3):
+            yield name, index
+            # Only reached once the merged stream's consumer asked for the next item
+            resumed.append((name, index))
+
+    async def consume():
+        consumed = []
+        merged = merge_streams(source("a"), source("b"))
+        async for item in merged:
+            consumed.append(item)
+            await asyncio.sleep(0.01)
+            if len(consumed) == 3:
+                break
+        await merged.aclose()
+        return consumed
+
+    consumed = asyncio.run(consume())
+    assert len(consumed) == 3
+    assert set(resumed) <= set(consumed)
+
+
+def test_merge_streams_drains_every_source():
+    async def source(name, count):
+        for index in range(count):
+            await asyncio.sleep(0)
+            yield name, index
+
+    async def consume():
+        return [item async for item in merge_streams(source("a", 3), source("b", 5))]
+
+    assert sorted(asyncio.run(consume())) == [("a", i) for i in range(3)] + [("b", i) for i in range(5)]
+
+
+def test_slow_stage_blocks_the_feed_instead_of_buffering():
+    fed, handled = [], []
+
+    async def fast(username):
+        return True
+
+    async def slow(username):
+        await asyncio.sleep(0.005)
+        handled.append(username)
+
+    def source():
+        for index in range(30):
+            # The feed waits on full queues: it never runs more than both buffers and
+            # the busy workers ahead of the slow stage
+            assert index - len(handled) <= 2 + 2 + 1 + 1 + 1
+            fed.append(index)
+            yield f"user{index}"
+
+    stages = [Stage("fast", fast, queue_size=2), Stage("slow", slow, queue_size=2)]
+    asyncio.run(StagedPipeline(stages).run(source()))
+
+    assert len(handled) == 30
+    assert all(stage.max_queue_depth <= 2 for stage in stages)
+    assert [(stage.processed, stage.failed) for stage in stages] == [(30, 0), (30, 0)]
+
+
+def test_failed_items_stop_at_their_stage_without_affecting_others():
+    reached_last = []
+
+    async def flaky(username):
+        if username == "user1":
+            raise RuntimeError("boom")
+        return username != "user2"
+
+    async def last(username):
+        reached_last.append(username)
+
+    stages = [Stage("flaky", flaky, workers=2), Stage("last", last)]
+    asyncio.run(StagedPipeline(stages).run([f"user{index}" for index in range(5)]))
+
+    assert sorted(reached_last) == ["user0", "user3", "user4"]
+    assert (stages[0].processed, stages[0].failed) == (3, 2)
+
+
+def test_scraper_pipeline_runs_every_phase_against_the_fake_server(scraper, fake_server):
+    usernames = fake_server._topic_usernames("programming")[:5]
+    progress = ProgressStore(None)
+    scraper.stage_workers = {"full_content": 3}
+    pipeline = scraper.build_pipeline(progress)
+
+    asyncio.run(pipeline.run(usernames))
+
+    assert [(row["stage"], row["processed"], row["failed"]) for row in pipeline.stats()] == [
+        (phase, 5, 0) for phase in ("details", "posts", "full_content", "followers")
+    ]
+    assert sorted(progress.members("followers_scraped_users")) == sorted(usernames)
@@ -0,0 +1,96 @@
+import json
+
+from infrastructure.progress_store import ProgressStore
+
+
+def test_journal_is_replayed_without_compaction(tmp_path):
+    path = str(tmp_path / "progress.json")
+    store = ProgressStore(path)
+    store.add("collected_users", "alice")
+    store.add("collected_users", "bob")
+    store.discard("collected_users", "alice")
+    store.set_cursor("topics", "programming", {"after": "abc", "rank": 20})
+    store.flush(force_sync=True)
+    # Simulate a crash: the journal is never folded into the snapshot
+    store._journal.close()
+
+    reloaded = ProgressStore(path)
+    assert reloaded.members("collected_users") == ["bob"]
+    assert reloaded.get_cursor("topics", "programming") == {"after": "abc", "rank": 20}
+    reloaded.close()
+
+
+def test_torn_final_line_is_truncated(tmp_path):
+    path = str(tmp_path / "progress.json")
+    store = ProgressStore(path)
+    store.add("detailed_users", "alice")
+    store.flush(force_sync=True)
+    store._journal.close()
+
+    with open(f"{path}.journal", "a", encoding="utf-8") as f:
+        f.write('["add", "detailed_users", "bo')
+
+    reloaded = ProgressStore(path)
+    assert reloaded.members("detailed_users") == ["alice"]
+    with open(f"{path}.journal", "rb") as f:
+        assert f.read().endswith(b"\n")
+
+    reloaded.add("detailed_users", "bob")
+    reloaded.close()
+    assert ProgressStore(path).members("detailed_users") == ["alice", "bob"]
+
+
+def test_read_leaves_a_live_progress_file_untouched(tmp_path):
+    path = str(tmp_path / "progress.json")
+    store = ProgressStore(path)
+    store.add("detailed_users", "alice")
+    store.close()
+    store = ProgressStore(path)
+    store.add("detailed_users", "bob")
+    store.flush(force_sync=True)
+    with open(f"{path}.journal", "a", encoding="utf-8") as f:
+        f.write('["add", "detailed_users", "ca')
+    files = {p.name: p.read_bytes() for p in tmp_path.iterdir()}
+
+    snapshot = ProgressStore.read(path)
+    assert snapshot.members("detailed_users") == ["alice", "bob"]
+    snapshot.add("detailed_users", "dave")
+    snapshot.close()
+    assert {p.name: p.read_bytes() for p in tmp_path.iterdir()} == files
+    store._journal.close()
+
+
+def test_close_compacts_into_the_legacy_snapshot_layout(tmp_path):
+    path = str(tmp_path / "progress.json")
+    store = ProgressStore(path)
+    store.add("completed_topics", "startup")
+    store.set("custom", 3)
+    store.close()
+
+    with open(path, encoding="utf-8") as f:
+        snapshot = json.load(f)
+    assert snapshot["completed_topics"] == ["startup"]
+    assert snapshot["values"] == {"custom": 3}
+    assert (tmp_path / "progress.json.journal").read_text() == ""
+
+
+def test_old_progress_files_load_unchanged(tmp_path):
+    path = tmp_path / "progress.json"
+    path.write_text(json.dumps({"collected_users": ["alice"], "completed_topics": ["devops"]}))
+
+    store = ProgressStore(str(path))
+    assert store.contains("collected_users", "alice")
+    assert store.contains("completed_topics", "devops")
+    assert store.count("detailed_users") == 0
+    store.close()
+
+
+def test_in_memory_store_writes_nothing(tmp_path):
+    store = ProgressStore(None)
+    assert store.add("collected_users", "alice")
+    assert not store.add("collected_users", "alice")
+    store.set_cursor("posts", "alice", {"from": "x"})
+    store.clear_cursor("posts", "alice")
+    store.close()
+    assert store.get_cursor("posts", "alice") is None
+    assert list(tmp_path.iterdir()) == []
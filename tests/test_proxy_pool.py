@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pytest
+
+from infrastructure.api.exceptions import ThrottledError
+from infrastructure.api.medium_api import MediumApi
+from infrastructure.api.proxy_pool import ProxyPool
+from infrastructure.api.transport import TransportResponse
+
+
+def test_consecutive_failures_quarantine_a_proxy():
+    pool = ProxyPool(["a", "b"], max_consecutive_failures=3)
+    for _ in range(3):
+        pool.report_failure("a")
+
+    assert {pool.choose() for _ in range(50)} == {"b"}
+    assert [row["quarantined"] for row in pool.stats() if row["proxy"] == "a"] == [True]
+
+
+def test_probation_failure_doubles_the_quarantine_and_success_clears_it():
+    pool = ProxyPool(["a", "b"], quarantine_seconds=30)
+    pool.report_failure("a", banned=True)
+    first = pool._stats["a"]
+
+    # Released onto probation: one more failure sends it straight back, for twice as long
+    first.quarantined_until = 0
+    released_at = time.monotonic()
+    pool.report_failure("a")
+    assert first.quarantine_count == 2
+    assert 59 < first.quarantined_until - released_at < 61
+
+    first.quarantined_until = 0
+    pool.report_success("a", latency=0.2)
+    pool.report_failure("a")
+    assert (first.quarantine_count, first.consecutive_failures) == (0, 1)
+    assert not first.is_quarantined(time.monotonic())
+
+
+def test_everything_quarantined_probes_the_closest_release():
+    pool = ProxyPool(["a", "b"], quarantine_seconds=30)
+    pool.report_failure("a", banned=True)
+    pool.report_failure("b", banned=True)
+    pool.report_failure("b", banned=True)
+
+    assert pool.choose() == "a"
+
+
+def test_no_proxies_means_direct_connections():
+    assert ProxyPool([]).choose() is None
+
+
+class StatusTransport:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    async def post(self, url, body, headers, proxy, impersonate):
+        return TransportResponse(self.status_code, b"", self.headers)
+
+    async def aclose(self):
+        pass
+
+
+def throttled_proxy_stats(status_code, headers=None):
+    api = MediumApi(proxy_list=["a"], transport=StatusTransport(status_code, headers))
+
+    async def send():
+        with pytest.raises(ThrottledError):
+            await api._send_post_request([{"operationName": "UserProfileQuery", "variables": {}}])
+        await api.aclose()
+
+    asyncio.run(send())
+    return api.proxy_pool._stats["a"]
+
+
+def test_rate_limited_proxy_is_throttled_but_not_banned():
+    stats = throttled_proxy_stats(429)
+    assert (stats.failures, stats.bans) == (1, 0)
+    assert not stats.is_quarantined(time.monotonic())
+
+
+def test_cloudflare_block_bans_the_proxy():
+    stats = throttled_proxy_stats(403, {"server": "cloudflare"})
+    assert stats.bans == 1
+    assert stats.is_quarantined(time.monotonic())
@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+from infrastructure.api.rate_limiter import AdaptiveRateLimiter, RequestBudget, TokenBucket
+
+
+def elapsed(coroutine) -> float:
+    started_at = time.monotonic()
+    asyncio.run(coroutine)
+    return time.monotonic() - started_at
+
+
+def test_token_bucket_paces_beyond_its_burst():
+    bucket = TokenBucket(rate=100, capacity=2)
+
+    async def acquire(count):
+        for _ in range(count):
+            await bucket.acquire()
+
+    assert elapsed(acquire(2)) < 0.01
+    assert elapsed(acquire(3)) >= 0.025
+
+
+def test_request_budget_overdraft_is_paid_back_before_the_next_reserve():
+    budget = RequestBudget(per_hour=100 * 3600)
+    budget.tokens = 0
+    budget.spend(3)
+
+    # 3 tokens of debt plus 1 for the reservation at 100 tokens/second
+    assert elapsed(budget.reserve(1)) >= 0.035
+    assert budget.tokens >= 1
+
+
+def test_request_budget_reserve_is_capped_at_capacity():
+    budget = RequestBudget(per_hour=3600, burst=5)
+    assert elapsed(budget.reserve(50)) < 0.01
+
+
+def test_adaptive_rate_limiter_backs_off_per_proxy_and_operation():
+    limiter = AdaptiveRateLimiter(initial_rate=4, min_rate=1, max_rate=5, increase=0.5, backoff=0.5)
+    limiter.on_success("proxy-a", "UserProfileQuery")
+    limiter.on_throttle("proxy-a", "UserFollowers")
+    limiter.on_throttle("proxy-a", "UserFollowers")
+    limiter.on_throttle("proxy-a", "UserFollowers")
+    limiter.on_success("proxy-a", "UserProfileQuery")
+    limiter.on_success("proxy-a", "UserProfileQuery")
+
+    assert limiter.rates() == {("proxy-a", "UserProfileQuery"): 5, ("proxy-a", "UserFollowers"): 1}
@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from application.refresh_daemon import RefreshDaemon
+from infrastructure.api.response_cache import ResponseCache
+from infrastructure.db.models.post import Post
+from infrastructure.progress_store import ProgressStore
+from infrastructure.repository import JobRepository, RefreshRepository, UserProgressRepository
+
+
+def test_refresh_fetches_live_data_even_with_a_warm_cache(scraper, session, fake_server, tmp_path):
+    username = fake_server._topic_usernames("programming")[0]
+    scraper.api.cache = ResponseCache(str(tmp_path / "cache"))
+    asyncio.run(scraper.scrape_user_details(username, ProgressStore(None)))
+
+    refresh = RefreshRepository(session)
+    refresh.seed([(username, "details", datetime.now(timezone.utc) - timedelta(days=3))])
+    daemon = RefreshDaemon(scraper, refresh)
+    asyncio.run(daemon.run())
+
+    assert (daemon.refreshed, daemon.failed) == (1, 0)
+    assert daemon.requests > 0
+
+
+def run_refresh_round(scraper, session, username, skip_unchanged_followers):
+    # Details and followers are both due; details comes first as the older entry
+    long_ago = datetime.now(timezone.utc) - timedelta(days=3)
+    refresh = RefreshRepository(session)
+    refresh.seed([(username, "details", long_ago - timedelta(days=1)), (username, "followers", long_ago)])
+    daemon = RefreshDaemon(scraper, refresh)
+    daemon.batch_size = 2
+    daemon.skip_unchanged_followers = skip_unchanged_followers
+    asyncio.run(daemon.run())
+    return daemon
+
+
+def test_unchanged_profile_still_refreshes_followers_by_default(scraper, session, fake_server):
+    username = fake_server._topic_usernames("programming")[0]
+    asyncio.run(scraper.scrape_user_details(username, ProgressStore(None)))
+
+    daemon = run_refresh_round(scraper, session, username, skip_unchanged_followers=False)
+    assert (daemon.refreshed, daemon.skipped) == (2, 0)
+
+
+def test_unchanged_profile_skips_followers_when_opted_in(scraper, session, fake_server):
+    username = fake_server._topic_usernames("programming")[0]
+    asyncio.run(scraper.scrape_user_details(username, ProgressStore(None)))
+
+    daemon = run_refresh_round(scraper, session, username, skip_unchanged_followers=True)
+    assert (daemon.refreshed, daemon.skipped) == (1, 1)
+
+
+def test_posts_refresh_continues_the_stored_backfill(scraper, session, fake_server):
+    username = fake_server._topic_usernames("programming")[0]
+    scraper.posts_max_pages = 1
+    progress = ProgressStore(None)
+    asyncio.run(scraper.scrape_user_details(username, progress))
+    asyncio.run(scraper.scrape_user_posts(username, progress))
+    progress.add("failed_full_content_posts", session.query(Post.id).first()[0])
+    states = UserProgressRepository(session)
+    states.save(username, progress.snapshot())
+
+    refresh = RefreshRepository(session)
+    refresh.seed([(username, "posts", datetime.now(timezone.utc) - timedelta(days=3))])
+    daemon = RefreshDaemon(scraper, refresh)
+    asyncio.run(daemon.run())
+
+    assert (daemon.refreshed, daemon.failed) == (1, 0)
+    assert session.query(Post).count() == 12
+    state = states.load(username)
+    assert username in state["posts_complete_users"]
+    assert f"cursor:posts_backfill:{username}" not in state["values"]
+    assert state["failed_full_content_posts"] == []
+
+
+def test_users_without_stored_progress_start_from_the_progress_file(scraper, session, fake_server, tmp_path):
+    username = fake_server._topic_usernames("programming")[0]
+    scraper.posts_max_pages = 1
+    scraper.progress_file = str(tmp_path / "progress.json")
+    progress = ProgressStore(scraper.progress_file)
+    asyncio.run(scraper.scrape_user_details(username, progress))
+    asyncio.run(scraper.scrape_user_posts(username, progress))
+    progress.close()
+
+    daemon = RefreshDaemon(scraper, RefreshRepository(session))
+    daemon.phases = ["posts"]
+    daemon.min_age = timedelta(0)
+    asyncio.run(daemon.run())
+
+    assert (daemon.refreshed, daemon.failed) == (1, 0)
+    assert session.query(Post).count() == 12
+    assert username in UserProgressRepository(session).load(username)["posts_complete_users"]
+
+
+def test_waiting_daemon_reseeds_before_sleeping(scraper, session, fake_server, monkeypatch):
+    username = fake_server._topic_usernames("programming")[0]
+    asyncio.run(scraper.scrape_user_details(username, ProgressStore(None)))
+    jobs = JobRepository(session)
+    jobs.enqueue([(username, "details")])
+    refresh = RefreshRepository(session)
+    daemon = RefreshDaemon(scraper, refresh, jobs)
+    daemon.phases = ["details"]
+    idle_polls = []
+
+    async def idle(seconds):
+        idle_polls.append(seconds)
+        if len(idle_polls) > 1:
+            raise asyncio.CancelledError
+        # A worker finishes the user's details job while the daemon waits
+        job, = jobs.claim("worker-a", limit=1, lease_seconds=60)
+        jobs.complete(job)
+
+    monkeypatch.setattr("application.refresh_daemon.asyncio.sleep", idle)
+    try:
+        asyncio.run(daemon.run(wait=True))
+    except asyncio.CancelledError:
+        pass
+
+    assert len(idle_polls) == 2
+    assert refresh.counts() == {"details": {"tracked": 1, "refreshes": 0}}
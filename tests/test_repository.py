@@ -0,0 +1,46 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.entities import UserData
+from infrastructure.async_repository import AsyncUserRepository, create_async_session_factory
+from infrastructure.db.models.user import User
+from infrastructure.repository import UserRepository
+
+
+def test_upsert_only_returns_inserted_or_changed_users(session):
+    users = UserRepository(session)
+    alice, bob = UserData(user_id="1", username="alice"), UserData(user_id="2", username="bob")
+
+    assert sorted(users.bulk_upsert_users([alice, bob])) == ["1", "2"]
+    assert users.bulk_upsert_users([alice, bob]) == []
+
+    alice.follower_count = 10
+    assert users.bulk_upsert_users([alice, bob]) == ["1"]
+    assert users.get_by_id("1").followers_count == 10
+
+
+def test_username_taken_by_another_id_moves_to_the_new_id(session):
+    users = UserRepository(session)
+    users.bulk_upsert_users([UserData(user_id="old", username="alice")])
+
+    assert users.bulk_upsert_users([UserData(user_id="new", username="alice", name="Alice")]) == ["new"]
+    assert users.get_by_username("alice").id == "new"
+    assert users.get_by_id("old").username is None
+
+
+def test_async_upsert_moves_a_taken_username(session, tmp_path):
+    UserRepository(session).bulk_upsert_users([UserData(user_id="old", username="alice")])
+
+    async def upsert():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+        try:
+            return await AsyncUserRepository(create_async_session_factory(engine)).bulk_upsert_users([
+                UserData(user_id="new", username="alice"), UserData(user_id="other", username="alice")
+            ])
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(upsert()) == ["other"]
+    session.expire_all()
+    assert {(user.id, user.username) for user in session.query(User)} == {("old", None), ("other", "alice")}
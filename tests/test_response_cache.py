@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+from infrastructure.api.medium_api import MediumApi
+from infrastructure.api.rate_limiter import AdaptiveRateLimiter
+from infrastructure.api.response_cache import ResponseCache
+from infrastructure.api.transport import TransportResponse
+from tests.conftest import FakeServerTransport
+
+
+def test_entries_expire_after_their_operation_ttl(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("infrastructure.api.response_cache.time.time", lambda: clock[0])
+    cache = ResponseCache(str(tmp_path), ttls={"UserProfileQuery": 60})
+    profile = {"operationName": "UserProfileQuery", "variables": {"username": "alice"}}
+    post = {"operationName": "FullPostQuery", "variables": {"postId": "p1"}}
+    cache.put(profile, {"data": {"user": "alice"}})
+    cache.put(post, {"data": {"post": "p1"}})
+
+    clock[0] += 59
+    assert cache.get(profile) == {"data": {"user": "alice"}}
+    clock[0] += 2
+    assert cache.get(profile) is None
+    # FullPostQuery never expires
+    clock[0] += 365 * 24 * 3600
+    assert cache.get(post) == {"data": {"post": "p1"}}
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 2, 1)
+    cache.close()
+
+
+def test_key_depends_only_on_operation_and_variables():
+    key = ResponseCache.make_key({"operationName": "UserFollowers", "variables": {"username": "alice", "limit": 25}})
+
+    assert key == ResponseCache.make_key({
+        "operationName": "UserFollowers", "variables": {"limit": 25, "username": "alice"}, "query": "query { ... }"
+    })
+    assert key != ResponseCache.make_key({"operationName": "UserFollowers", "variables": {"username": "alice", "limit": 50}})
+    assert key != ResponseCache.make_key({"operationName": "UserProfileQuery", "variables": {"username": "alice", "limit": 25}})
+
+
+class ErrorOnceTransport(FakeServerTransport):
+    """Answers the first request with a GraphQL error payload."""
+
+    async def post(self, url, body, headers, proxy, impersonate):
+        if not self.requests:
+            self.requests += 1
+            return TransportResponse(200, json.dumps([{"errors": [{"message": "busy"}], "data": None}]).encode())
+        return await super().post(url, body, headers, proxy, impersonate)
+
+
+def test_error_payloads_are_not_cached(fake_server, tmp_path):
+    transport = ErrorOnceTransport(fake_server)
+    api = MediumApi(
+        transport=transport,
+        cache=ResponseCache(str(tmp_path / "cache")),
+        rate_limiter=AdaptiveRateLimiter(initial_rate=10000, max_rate=10000)
+    )
+
+    async def fetch():
+        responses = [await api.get_user_data("alice") for _ in range(3)]
+        await api.aclose()
+        return responses
+
+    first, second, third = asyncio.run(fetch())
+    assert first[0]["errors"]
+    assert second[0]["data"] and third == second
+    assert transport.requests == 2
@@ -0,0 +1,195 @@
+import asyncio
+import json
+
+from infrastructure.api.transport import TransportResponse
+from infrastructure.db.models.post import Post
+from infrastructure.db.models.topic import topic_users
+from infrastructure.progress_store import ProgressStore
+from tests.conftest import FakeServerTransport
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_followers_phase_gives_up_on_a_page_that_keeps_failing(scraper, fake_server, monkeypatch):
+    username = fake_server._topic_usernames("programming")[0]
+    progress = ProgressStore(None)
+    run(scraper.scrape_user_details(username, progress))
+
+    attempts = []
+
+    async def failing_store(user_id, followers):
+        attempts.append(user_id)
+        raise RuntimeError("foreign key violation")
+
+    async def no_sleep(seconds):
+        pass
+
+    monkeypatch.setattr(scraper, "_store_followers", failing_store)
+    monkeypatch.setattr("application.scraper_service.asyncio.sleep", no_sleep)
+    run(scraper.scrape_user_followers(username, progress))
+
+    assert len(attempts) == 3
+    assert not progress.contains("followers_scraped_users", username)
+
+
+def test_capped_author_continues_the_post_backfill_on_later_runs(scraper, fake_server, session):
+    username = fake_server._topic_usernames("programming")[0]
+    progress = ProgressStore(None)
+    run(scraper.scrape_user_details(username, progress))
+    scraper.posts_max_pages = 1
+
+    run(scraper.scrape_user_posts(username, progress))
+    assert progress.contains("posts_scraped_users", username)
+    assert not progress.contains("posts_complete_users", username)
+    assert progress.get_cursor("posts_backfill", username) == {"from": "10", "saved": 10}
+
+    run(scraper.scrape_user_posts(username, progress))
+    assert progress.contains("posts_complete_users", username)
+    assert progress.get_cursor("posts_backfill", username) is None
+    assert session.query(Post).count() == 12
+
+
+class FeedTransport(FakeServerTransport):
+    """Fails the first feed page of `broken_topic` and drops `to` from every next cursor."""
+
+    def __init__(self, server, broken_topic):
+        super().__init__(server)
+        self.broken_topic = broken_topic
+        self.feed_paging = []
+
+    async def post(self, url, body, headers, proxy, impersonate):
+        operation = body[0]
+        if operation["operationName"] == "TagRecommendedFeedQuery":
+            variables = operation["variables"]
+            self.feed_paging.append((variables["tagSlug"], variables["paging"]))
+            if variables["tagSlug"] == self.broken_topic:
+                self.broken_topic = None
+                return TransportResponse(200, json.dumps([{"errors": [{"message": "rate limited"}]}]).encode())
+        response = await super().post(url, body, headers, proxy, impersonate)
+        payload = json.loads(response.content)
+        for result in payload:
+            feed = (((result.get("data") or {}).get("tagFromSlug") or {}).get("viewerEdge") or {}).get("recommendedPostsFeed")
+            if feed and feed["pagingInfo"]["next"]:
+                feed["pagingInfo"]["next"].pop("to", None)
+        return TransportResponse(200, json.dumps(payload).encode())
+
+
+def test_feed_error_payload_is_retried_and_from_only_cursors_page(scraper, fake_server):
+    transport = FeedTransport(fake_server, broken_topic="data-science")
+    scraper.api.transport = transport
+    progress = ProgressStore(None)
+
+    async def first_posts(count):
+        posts = []
+        stream = scraper.stream_topic_posts(["data-science", "programming"], progress)
+        async for topic, post in stream:
+            posts.append(topic)
+            if len(posts) == count:
+                break
+        await stream.aclose()
+        return posts
+
+    topics = run(first_posts(20))
+    assert set(topics) == {"programming"}
+    assert progress.get_cursor("feed", "data-science") is None
+    assert ("programming", {"from": "10", "limit": 10}) in transport.feed_paging
+
+
+def test_topic_recrawl_runs_even_when_the_target_is_reached(scraper, session):
+    scraper.target_users = 0
+    scraper.topic_recrawl = True
+
+    run(scraper.all_in_one(["programming"]))
+
+    assert session.query(topic_users).filter(topic_users.c.topic_slug == "programming").count() == 40
+
+
+def test_topic_page_users_survive_a_membership_write_failure(scraper, monkeypatch):
+    async def failing_store(topic, users, start_rank):
+        raise RuntimeError("foreign key violation")
+
+    async def collect():
+        return [username async for _, username, _, _ in scraper.discover_topic_users(["programming"], progress)]
+
+    monkeypatch.setattr(scraper, "_store_topic_members", failing_store)
+    progress = ProgressStore(None)
+
+    assert len(run(collect())) == 40
+    assert progress.contains("completed_topics", "programming")
+
+
+def test_scrape_users_keeps_at_most_concurrency_users_in_flight(scraper, fake_server, monkeypatch):
+    usernames = fake_server._topic_usernames("programming")[:10]
+    scraper.concurrency = 3
+    progress = ProgressStore(None)
+    in_flight, peak, fed = [], [], []
+    scrape_user = scraper.scrape_user
+
+    async def tracked(username, progress):
+        in_flight.append(username)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        await scrape_user(username, progress)
+        in_flight.remove(username)
+
+    async def source():
+        for username in usernames:
+            fed.append(username)
+            # Never more than the workers plus their bounded queue ahead of the finished users
+            assert len(fed) - len(progress.members("followers_scraped_users")) <= 3 + 3 * 2 + 1
+            yield username
+
+    monkeypatch.setattr(scraper, "scrape_user", tracked)
+    run(scraper.scrape_users(source(), progress))
+
+    assert max(peak) == 3
+    assert sorted(progress.members("followers_scraped_users")) == sorted(usernames)
+
+
+class SlowFullPostTransport(FakeServerTransport):
+    """Holds every FullPostQuery briefly and records how many overlap."""
+
+    def __init__(self, server):
+        super().__init__(server)
+        self.in_flight = 0
+        self.peak = 0
+
+    async def post(self, url, body, headers, proxy, impersonate):
+        if body[0]["operationName"] != "FullPostQuery":
+            return await super().post(url, body, headers, proxy, impersonate)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return await super().post(url, body, headers, proxy, impersonate)
+
+
+def test_full_content_fan_out_is_bounded_and_commits_each_post(scraper, fake_server, session, monkeypatch):
+    username = fake_server._topic_usernames("programming")[0]
+    scraper.posts_max_pages = 0
+    progress = ProgressStore(None)
+    run(scraper.scrape_user_details(username, progress))
+    run(scraper.scrape_user_posts(username, progress))
+
+    transport = SlowFullPostTransport(fake_server)
+    scraper.api.transport = transport
+    scraper.full_content_slots = asyncio.Semaphore(4)
+    broken = session.query(Post.id).order_by(Post.id).first()[0]
+    store_content = scraper._store_post_content
+
+    async def failing_store(post_id, content):
+        if post_id == broken:
+            raise RuntimeError("value too long")
+        await store_content(post_id, content)
+
+    monkeypatch.setattr(scraper, "_store_post_content", failing_store)
+    run(scraper.scrape_full_post_contents(username, progress))
+
+    assert transport.peak == 4
+    assert progress.members("failed_full_content_posts") == [broken]
+    session.expire_all()
+    missing = [post_id for post_id, in session.query(Post.id).filter(Post.content.is_(None))]
+    assert missing == [broken]
+    assert session.query(Post).count() == 12
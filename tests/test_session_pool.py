@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from infrastructure.api.exceptions import ThrottledError
+from infrastructure.api.medium_api import MediumApi
+from infrastructure.api.transport import TransportResponse
+
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FailingTransport:
+    def __init__(self, error=None, status_code=200, headers=None):
+        self.error = error
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    async def post(self, url, body, headers, proxy, impersonate):
+        if self.error:
+            raise self.error
+        return TransportResponse(self.status_code, b"", self.headers)
+
+    async def aclose(self):
+        pass
+
+
+def send(api, expected_error):
+    async def run():
+        with pytest.raises(expected_error):
+            await api._send_post_request([{"operationName": "UserProfileQuery", "variables": {}}])
+
+    asyncio.run(run())
+
+
+def pooled_api(transport):
+    api = MediumApi(proxy_list=["a", "b"], transport=transport)
+    sessions = {key: FakeSession() for key in (("a", "chrome"), ("a", "chrome110"), ("b", "chrome"))}
+    api.sessions._sessions.update(sessions)
+    api.proxy_pool.choose = lambda: "a"
+    return api, sessions
+
+
+def test_connection_error_discards_only_the_failed_session():
+    api, sessions = pooled_api(FailingTransport(error=ConnectionError("reset by peer")))
+    send(api, ConnectionError)
+
+    assert sessions[("a", "chrome")].closed
+    assert set(api.sessions._sessions) == {("a", "chrome110"), ("b", "chrome")}
+
+
+def test_quarantined_proxy_loses_all_its_sessions():
+    api, sessions = pooled_api(FailingTransport(status_code=403, headers={"server": "cloudflare"}))
+    send(api, ThrottledError)
+
+    assert sessions[("a", "chrome")].closed and sessions[("a", "chrome110")].closed
+    assert set(api.sessions._sessions) == {("b", "chrome")}
+
+
+def test_rate_limit_keeps_the_session():
+    api, sessions = pooled_api(FailingTransport(status_code=429))
+    send(api, ThrottledError)
+
+    assert len(api.sessions) == 3
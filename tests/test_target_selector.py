@@ -0,0 +1,50 @@
+from application.target_selector import TargetSelector
+
+WEIGHTS = {"overlap": 10, "claps": 0.01, "rank": -0.05}
+
+
+def test_keeps_the_best_candidates_and_evicts_the_weakest():
+    selector = TargetSelector(capacity=2, weights=WEIGHTS)
+
+    assert selector.offer("programming", "alice", "1", {"claps": 100})
+    assert selector.offer("programming", "bob", "2", {"claps": 300})
+    assert selector.offer("programming", "carol", "3", {"claps": 200})
+    assert not selector.offer("programming", "dave", "4", {"claps": 50})
+
+    assert [candidate.username for candidate in selector.best()] == ["bob", "carol"]
+
+
+def test_topic_overlap_rescores_a_member_in_place():
+    selector = TargetSelector(capacity=2, weights=WEIGHTS)
+    selector.offer("programming", "alice", "1", {"rank": 40})
+    selector.offer("programming", "bob", "2", {"rank": 0})
+
+    selector.offer("data-science", "alice", "1", {"rank": 10})
+    alice = selector.best()[0]
+    assert alice.username == "alice"
+    assert (alice.topics, alice.best_rank, alice.score) == ({"programming", "data-science"}, 10, 20 - 0.5)
+
+    # The stale heap entry for alice's old score must not make her the eviction victim
+    selector.offer("programming", "carol", "3", {"rank": 5, "claps": 100})
+    assert [candidate.username for candidate in selector.best()] == ["alice", "carol"]
+
+
+def test_saturates_on_stop_score_or_patience():
+    by_score = TargetSelector(capacity=2, weights=WEIGHTS, stop_score=10)
+    by_score.offer("programming", "alice", "1", {})
+    assert not by_score.saturated
+    by_score.offer("programming", "bob", "2", {})
+    assert by_score.saturated
+
+    by_patience = TargetSelector(capacity=1, weights=WEIGHTS, patience=2)
+    by_patience.offer("programming", "alice", "1", {"claps": 500})
+    by_patience.offer("programming", "bob", "2", {})
+    assert not by_patience.saturated
+    by_patience.offer("programming", "carol", "3", {})
+    assert by_patience.saturated
+
+
+def test_zero_capacity_never_selects():
+    selector = TargetSelector(capacity=0, weights=WEIGHTS)
+    assert not selector.offer("programming", "alice", "1", {"claps": 100})
+    assert selector.best() == []
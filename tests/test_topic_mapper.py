@@ -0,0 +1,22 @@
+from infrastructure.utils.topic_mapper import extract_topic_rows
+
+
+def test_rows_carry_id_paths_parents_first():
+    response = [{"data": {"rootTags": [
+        {"id": "technology", "displayTitle": "Technology", "childTags": [
+            {"id": "tech-companies", "displayTitle": "Tech Companies", "childTags": [
+                {"id": "tiktok", "displayTitle": "Tiktok", "normalizedTagSlug": "tik-tok"},
+            ]},
+        ]},
+        {"id": "life", "displayTitle": "Life"},
+    ]}}]
+
+    rows = extract_topic_rows(response)
+
+    assert [(row["id"], row["parent_id"], row["path"], row["depth"]) for row in rows] == [
+        ("technology", None, "/technology/", 0),
+        ("tech-companies", "technology", "/technology/tech-companies/", 1),
+        ("tiktok", "tech-companies", "/technology/tech-companies/tiktok/", 2),
+        ("life", None, "/life/", 0),
+    ]
+    assert {row["id"]: row["normalized_slug"] for row in rows}["tiktok"] == "tik-tok"
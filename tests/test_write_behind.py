@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+from core.entities import UserData, PostData
+from infrastructure.db.models.post import Post
+from infrastructure.db.models.user import User
+from infrastructure.write_behind import WriteBehindWriter
+
+
+def post(post_id, author_id, published_at="1700000000000"):
+    return PostData(post_id=post_id, author_id=author_id, title=post_id, published_at=published_at)
+
+
+def test_writes_queued_during_a_batch_are_committed_together(session_factory):
+    async def write():
+        writer = WriteBehindWriter(session_factory, max_delay=5)
+        loop = asyncio.get_running_loop()
+        acks = []
+        # Queued before the thread starts, as if they arrived while a batch was being written
+        for user_id, username in (("1", "alice"), ("2", "bob")):
+            acks.append(loop.create_future())
+            writer._queue.put(("users", ([UserData(user_id=user_id, username=username)], {}), acks[-1], loop))
+        writer.start()
+        try:
+            return await asyncio.gather(*acks)
+        finally:
+            await writer.close()
+            assert writer.batches == 1
+
+    assert asyncio.run(write()) == [["1"], ["2"]]
+
+
+def test_a_lone_write_does_not_wait_for_the_batch_window(session_factory):
+    async def write():
+        writer = WriteBehindWriter(session_factory, max_delay=5)
+        try:
+            started_at = time.monotonic()
+            ack = await writer.put_users([UserData(user_id="1", username="alice")])
+            return ack, time.monotonic() - started_at
+        finally:
+            await writer.close()
+
+    ack, waited = asyncio.run(write())
+    assert ack == ["1"]
+    assert waited < 1
+
+
+def test_bad_payload_only_fails_its_own_caller(session_factory):
+    async def write():
+        writer = WriteBehindWriter(session_factory, max_delay=0.05)
+        try:
+            await writer.put_users([UserData(user_id="1", username="alice")])
+            return await asyncio.gather(
+                writer.put_posts([post("p1", "1")]),
+                writer.put_posts([post("p2", "1", published_at="not a timestamp")]),
+                writer.put_posts([post("p3", "1")]),
+                return_exceptions=True
+            )
+        finally:
+            await writer.close()
+
+    first, bad, third = asyncio.run(write())
+    assert (first, third) == (["p1"], ["p3"])
+    assert isinstance(bad, ValueError)
+
+    session = session_factory()
+    assert sorted(post_id for post_id, in session.query(Post.id)) == ["p1", "p3"]
+    assert session.query(User).count() == 1
+    session.close()